@@ -16,9 +16,9 @@ logger = logging.getLogger(__name__)
 SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
 
 # --- Add Debug Logging --- #
-logger.info(f"DEBUG: Attempting to read SUPABASE_JWT_SECRET.")
+logger.info("DEBUG: Attempting to read SUPABASE_JWT_SECRET.")
 if SUPABASE_JWT_SECRET:
-    logger.info(f"DEBUG: SUPABASE_JWT_SECRET found. Length: {len(SUPABASE_JWT_SECRET)}, Starts with: {SUPABASE_JWT_SECRET[:3]}...")
+    logger.info("DEBUG: SUPABASE_JWT_SECRET found. Length: %s, Starts with: %s...", len(SUPABASE_JWT_SECRET), SUPABASE_JWT_SECRET[:3])
 else:
     logger.warning("DEBUG: SUPABASE_JWT_SECRET environment variable NOT found or is empty.")
 # --- End Debug Logging --- #
@@ -27,15 +27,15 @@ if not SUPABASE_JWT_SECRET:
     logger.warning("SUPABASE_JWT_SECRET not found in environment variables. Authentication will not work properly.")
 
 # Print detailed information about the JWT secret
-logger.info(f"JWT secret configured: {bool(SUPABASE_JWT_SECRET)}")
+logger.info("JWT secret configured: %s", bool(SUPABASE_JWT_SECRET))
 if SUPABASE_JWT_SECRET:
-    logger.info(f"JWT secret length: {len(SUPABASE_JWT_SECRET)}")
-    logger.info(f"JWT secret first 5 chars: {SUPABASE_JWT_SECRET[:5] if len(SUPABASE_JWT_SECRET) >= 5 else SUPABASE_JWT_SECRET}")
+    logger.info("JWT secret length: %s", len(SUPABASE_JWT_SECRET))
+    logger.info("JWT secret first 5 chars: %s", SUPABASE_JWT_SECRET[:5] if len(SUPABASE_JWT_SECRET) >= 5 else SUPABASE_JWT_SECRET)
     
     # Check if Base64 encoded
     try:
         decoded = base64.b64decode(SUPABASE_JWT_SECRET)
-        logger.info(f"JWT secret appears to be Base64 encoded, decoded length: {len(decoded)}")
+        logger.info("JWT secret appears to be Base64 encoded, decoded length: %s", len(decoded))
     except:
         logger.info("JWT secret does not appear to be Base64 encoded")
 
@@ -59,7 +59,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             )
             
         token = credentials.credentials
-        logger.info(f"Validating token: {token[:10]}... (length: {len(token)})")
+        logger.debug("Validating token: %s... (length: %s)", token[:10], len(token))
         
         # First try to decode the token without verification to check its structure
         try:
@@ -67,7 +67,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
                 token, 
                 options={"verify_signature": False}
             )
-            logger.info(f"Token header/payload decoded: {list(unverified_payload.keys())}")
+            logger.debug("Token header/payload decoded: %s", list(unverified_payload.keys()))
             
             # Extract user info now - we'll use this as a fallback
             user_id = unverified_payload.get('sub')
@@ -76,9 +76,10 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             # Detailed debug info about the token
             issuer = unverified_payload.get('iss', '')
             audience = unverified_payload.get('aud', '')
-            logger.info(f"Token issuer: {issuer}")
-            logger.info(f"Token audience: {audience}")
-            logger.info(f"Token algorithm (from header): {jwt.get_unverified_header(token).get('alg')}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Token issuer: %s", issuer)
+                logger.debug("Token audience: %s", audience)
+                logger.debug("Token algorithm (from header): %s", jwt.get_unverified_header(token).get('alg'))
             
             # TEMPORARY WORKAROUND - While JWT secret issues are being fixed
             # In production, NEVER skip proper JWT verification
@@ -91,7 +92,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
                 logger.warning("⚠️ USING TEMPORARY WORKAROUND: Token looks like a valid Supabase token, bypassing JWT verification")
                 logger.warning("This is insecure and should only be used temporarily while fixing JWT issues")
                 
-                logger.info(f"User authenticated via WORKAROUND: id={user_id}, email={email}")
+                logger.info("User authenticated via WORKAROUND: id=%s, email=%s", user_id, email)
                 return User(id=user_id, email=email)
                 
             # Now try different verification approaches
@@ -104,10 +105,10 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
                     algorithms=["HS256"],
                     options={"verify_signature": True}
                 )
-                logger.info(f"JWT decoded successfully with standard verification. Claims: sub={payload.get('sub')}, email={payload.get('email')}")
+                logger.info("JWT decoded successfully with standard verification. Claims: sub=%s, email=%s", payload.get('sub'), payload.get('email'))
                 return User(id=payload.get('sub'), email=payload.get('email'))
             except Exception as e:
-                logger.error(f"Standard verification failed: {str(e)}")
+                logger.error("Standard verification failed: %s", str(e))
                 
                 # Try using the key directly as is
                 try:
@@ -118,10 +119,10 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
                         algorithms=["HS256"],
                         options={"verify_signature": True}
                     )
-                    logger.info(f"JWT decoded successfully with raw key. Claims: sub={payload.get('sub')}")
+                    logger.info("JWT decoded successfully with raw key. Claims: sub=%s", payload.get('sub'))
                     return User(id=payload.get('sub'), email=payload.get('email'))
                 except Exception as e:
-                    logger.error(f"Raw key verification failed: {str(e)}")
+                    logger.error("Raw key verification failed: %s", str(e))
                     
                     # Try using base64 decoded key
                     try:
@@ -133,10 +134,10 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
                             algorithms=["HS256"],
                             options={"verify_signature": True}
                         )
-                        logger.info(f"JWT decoded successfully with base64 decoded key. Claims: sub={payload.get('sub')}")
+                        logger.info("JWT decoded successfully with base64 decoded key. Claims: sub=%s", payload.get('sub'))
                         return User(id=payload.get('sub'), email=payload.get('email'))
                     except Exception as e:
-                        logger.error(f"Base64 decoded key verification failed: {str(e)}")
+                        logger.error("Base64 decoded key verification failed: %s", str(e))
                         
                     # All verification methods failed
                     raise HTTPException(
@@ -146,7 +147,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
                     )
                 
         except jwt.InvalidTokenError as e:
-            logger.error(f"Invalid token format: {str(e)}")
+            logger.error("Invalid token format: %s", str(e))
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=f"Invalid token format: {str(e)}",
@@ -156,7 +157,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Authentication error: {str(e)}")
+        logger.error("Authentication error: %s", str(e))
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Authentication error: {str(e)}"
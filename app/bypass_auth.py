@@ -21,7 +21,6 @@ async def emergency_chat(request: dict):
 """
 
 import logging
-import json
 import uuid
 from fastapi import HTTPException
 from pydantic import BaseModel
@@ -1,87 +1,346 @@
 import os
+import bcrypt
+import collections
+import datetime
+import functools
+import hashlib
+import hmac
+import itertools
 import logging
+import re
+import threading
+import httpx
 from supabase import create_client, Client
-from dotenv import load_dotenv
+from postgrest.types import ReturnMethod
 import time
-import json
+import orjson
 import uuid
 import traceback
-from typing import List, Dict, Optional
-
-# Load environment variables
-load_dotenv()
+import types
+from typing import List, Dict, Optional, Tuple
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-# Use the service role key for backend operations
-SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY") 
-# Fallback to SUPABASE_KEY if service key is not set (less ideal, but provides backward compatibility)
-if not SUPABASE_KEY:
-    logger.warning("SUPABASE_SERVICE_KEY not found, falling back to SUPABASE_KEY. Ensure service role key is set for full backend permissions.")
-    SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-
-# --- Add Logging Here (Near Supabase Init) ---
-logger.info(f"DATABASE INIT: Attempting Supabase connection.")
-logger.info(f"DATABASE INIT: SUPABASE_URL loaded: {bool(SUPABASE_URL)}")
-logger.info(f"DATABASE INIT: SUPABASE_KEY loaded: {bool(SUPABASE_KEY)}")
-if SUPABASE_KEY:
-    key_preview = SUPABASE_KEY[:5] + "..." + SUPABASE_KEY[-5:]
-    logger.info(f"DATABASE INIT: SUPABASE_KEY preview: {key_preview}")
-    if SUPABASE_KEY.startswith("eyJ"):
-        logger.info("DATABASE INIT: Key appears to be a service role key (starts with eyJ).")
-    else:
-        logger.warning("DATABASE INIT: Key does NOT start with eyJ. Might be an anon key?")
-else:
-    logger.error("DATABASE INIT: SUPABASE_KEY is NOT LOADED from environment!")
-# --- End Logging ---
-
-# Default profile data to use if DB is not available
-DEFAULT_PROFILE = {
+# Filled in by _init() on first use, after .env has been loaded
+SUPABASE_URL: Optional[str] = None
+SUPABASE_KEY: Optional[str] = None
+
+# Default profile data to use if DB is not available. Read-only, so it can be returned and merged
+# ({**DEFAULT_PROFILE, ...}) without defensive copies and no caller can change it for everyone else.
+DEFAULT_PROFILE = types.MappingProxyType({
     "name": "John Doe",
     "bio": "I am John, a software engineer with a passion for building AI and web applications. I specialize in full-stack development and have experience across the entire development lifecycle.",
     "skills": "JavaScript, TypeScript, React, Node.js, Python, FastAPI, PostgreSQL, ChromaDB, Supabase, Next.js, TailwindCSS",
     "experience": "5+ years of experience in full-stack development, with a focus on building AI-powered applications and responsive web interfaces.",
     "interests": "AI, machine learning, web development, reading sci-fi, hiking",
     "location": "San Francisco, CA",
-}
-
-# Initialize Supabase client or None if connection fails
-supabase: Optional[Client] = None
-
-# Try to connect to Supabase
-try:
-    logger.info(f"Connecting to Supabase at {SUPABASE_URL[:20]}...")
-    if SUPABASE_URL and SUPABASE_KEY:
-        supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-        logger.info("Successfully connected to Supabase")
-except Exception as e:
-    logger.error(f"Failed to connect to Supabase: {e}")
-    supabase = None
-
-# Load the in-memory profile from the backup file if it exists
-try:
-    if os.path.exists('profile_backup.json'):
-        with open('profile_backup.json', 'r') as f:
-            in_memory_profile = json.load(f)
-            logger.info(f"Loaded profile from backup file with name: {in_memory_profile.get('name', 'unknown')}")
-    else:
-        in_memory_profile = DEFAULT_PROFILE.copy()
-        logger.info(f"No backup file found, using default profile with name: {in_memory_profile.get('name', 'unknown')}")
-        # Save the default profile to the backup file
-        with open('profile_backup.json', 'w') as f:
-            json.dump(in_memory_profile, f, indent=2)
-            logger.info("Created initial profile backup file")
-except Exception as e:
-    logger.error(f"Error loading profile from backup: {e}")
-    in_memory_profile = DEFAULT_PROFILE.copy()
-    logger.warning("Using default profile after backup load error")
+})
+
+# Profile columns the app reads and writes (mirrors models.ProfileData). Selecting these instead of
+# "*" keeps legacy columns such as projects/project_list out of every profile payload.
+PROFILE_FIELDS = ("id", "user_id", "bio", "skills", "experience",
+                  "interests", "name", "location",
+                  "created_at", "updated_at",
+                  "calendly_link", "meeting_rules", "profile_photo_url")
+PROFILE_COLUMNS = ",".join(PROFILE_FIELDS)
+# Set form of PROFILE_FIELDS for O(1) membership tests when filtering write payloads
+_PROFILE_FIELD_SET = frozenset(PROFILE_FIELDS)
+# Text columns that must never be saved empty, filled from DEFAULT_PROFILE when missing
+_REQUIRED_PROFILE_FIELDS = ("bio", "skills", "experience", "interests")
+# Message columns returned by get_chat_history: exactly what log_chat_message writes, so history
+# reads never pull columns nothing in the app consumes
+MESSAGE_COLUMNS = "id,conversation_id,chatbot_id,message,response,sender,metadata,created_at,timestamp"
+
+# (epoch second, formatted string) of the last _now_iso() call; swapped as one tuple so threads never see a torn pair
+_now_iso_cache: Tuple[int, str] = (-1, "")
+
+def _now_iso() -> str:
+    """Current UTC time as an ISO-8601 string with second precision, e.g. 2024-01-31T12:00:00Z"""
+    global _now_iso_cache
+    second = int(time.time())
+    cached_second, cached = _now_iso_cache
+    if second == cached_second:
+        return cached
+    t = time.gmtime(second)
+    formatted = f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}T{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}Z"
+    _now_iso_cache = (second, formatted)
+    return formatted
+
+_TIMESTAMP_RE = re.compile(r"^(\d{4}-\d\d-\d\d[T ]\d\d:\d\d:\d\d)(?:\.(\d+))?(Z|[+-]\d\d(?::?\d\d)?)?$")
+
+def _parse_timestamp(value: str) -> datetime.datetime:
+    """
+    Parse a timestamp from Postgres (e.g. 2024-01-31 12:00:00.12+00:00) or _now_iso() (2024-01-31T12:00:00Z)
+    into an aware UTC datetime, so values in either format compare correctly
+    """
+    match = _TIMESTAMP_RE.match(value.strip())
+    if not match:
+        raise ValueError(f"Invalid timestamp: {value}")
+    base, fraction, offset = match.groups()
+    # Python 3.9's fromisoformat only takes 3 or 6 fractional digits, and Postgres trims trailing zeros
+    text = base.replace(" ", "T") + ("." + fraction[:6].ljust(6, "0") if fraction else "")
+    if not offset or offset == "Z":
+        offset = "+00:00"
+    elif len(offset) == 3:
+        offset += ":00"
+    elif ":" not in offset:
+        offset = offset[:3] + ":" + offset[3:]
+    return datetime.datetime.fromisoformat(text + offset).astimezone(datetime.timezone.utc)
+
+def _first_row(response) -> Optional[Dict]:
+    """
+    First row of a PostgREST response, or None when nothing came back.
+    Handles both list responses and the single object (or None) from .maybe_single()
+    """
+    data = getattr(response, "data", None) if response is not None else None
+    if not data:
+        return None
+    return data[0] if isinstance(data, list) else data
 
-in_memory_messages = []
+_supabase_client: Optional[Client] = None
+_supabase_lock = threading.Lock()
+# Seconds to wait before trying to create the client again after create_client failed
+SUPABASE_RETRY_SECONDS = 30.0
+_supabase_retry_at = 0.0
+_initialized = False
+_init_lock = threading.Lock()
+
+def _init() -> None:
+    """
+    One-time module setup: load .env, read the Supabase settings and restore the profile backup.
+    Runs lazily on first database use (or from the app's startup hook), so importing this module
+    in scripts and tools that never touch the DB stays cheap.
+    """
+    global _initialized, SUPABASE_URL, SUPABASE_KEY, in_memory_messages, PROFILE_CACHE_TTL, PROFILE_CACHE_MAX_SIZE
+    if _initialized:
+        return
+
+    with _init_lock:
+        if _initialized:
+            return
+
+        from dotenv import load_dotenv
+        load_dotenv()
+
+        SUPABASE_URL = os.getenv("SUPABASE_URL")
+        # Use the service role key for backend operations
+        SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
+        # Fallback to SUPABASE_KEY if service key is not set (less ideal, but provides backward compatibility)
+        if not SUPABASE_KEY:
+            logger.warning("SUPABASE_SERVICE_KEY not found, falling back to SUPABASE_KEY. Ensure service role key is set for full backend permissions.")
+            SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+
+        logger.info("DATABASE INIT: SUPABASE_URL loaded: %s", bool(SUPABASE_URL))
+        logger.info("DATABASE INIT: SUPABASE_KEY loaded: %s", bool(SUPABASE_KEY))
+        if SUPABASE_KEY:
+            key_preview = SUPABASE_KEY[:5] + "..." + SUPABASE_KEY[-5:]
+            logger.info("DATABASE INIT: SUPABASE_KEY preview: %s", key_preview)
+            if SUPABASE_KEY.startswith("eyJ"):
+                logger.info("DATABASE INIT: Key appears to be a service role key (starts with eyJ).")
+            else:
+                logger.warning("DATABASE INIT: Key does NOT start with eyJ. Might be an anon key?")
+        else:
+            logger.error("DATABASE INIT: SUPABASE_KEY is NOT LOADED from environment!")
+
+        PROFILE_CACHE_TTL = float(os.getenv("PROFILE_CACHE_TTL", str(PROFILE_CACHE_TTL)))
+        PROFILE_CACHE_MAX_SIZE = int(os.getenv("PROFILE_CACHE_MAX_SIZE", str(PROFILE_CACHE_MAX_SIZE)))
+
+        # Size the fallback message log now that .env is loaded (CHAT_INMEM_CAP)
+        with _in_memory_messages_lock:
+            in_memory_messages = collections.deque(
+                in_memory_messages, maxlen=int(os.getenv("CHAT_INMEM_CAP", str(IN_MEMORY_MESSAGES_MAX))))
+
+        _load_profile_backup()
+
+        _initialized = True
+
+def _use_orjson_decoder(response: httpx.Response) -> None:
+    """Response hook: make response.json() decode the body with orjson instead of stdlib json"""
+    response.json = lambda **kwargs: orjson.loads(response.content)
+
+def _configure_http_pool(client: Client) -> None:
+    """Replace the default PostgREST session with a tuned keep-alive connection pool"""
+    default_session = client.postgrest.session
+    # Limits and HTTP/2 live on the transport; httpx ignores the Client-level settings once one is passed.
+    # retries only re-attempts failed connects, so a dropped keep-alive socket is replaced transparently.
+    transport = httpx.HTTPTransport(
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=int(os.getenv("SUPABASE_MAX_CONNECTIONS", "60")),
+            max_keepalive_connections=int(os.getenv("SUPABASE_MAX_KEEPALIVE_CONNECTIONS", "40")),
+            keepalive_expiry=float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", "60")),
+        ),
+        retries=int(os.getenv("SUPABASE_CONNECT_RETRIES", "3")),
+    )
+    client.postgrest.session = httpx.Client(
+        base_url=default_session.base_url,
+        headers=default_session.headers,
+        transport=transport,
+        timeout=httpx.Timeout(
+            float(os.getenv("SUPABASE_TIMEOUT", "10")),
+            connect=float(os.getenv("SUPABASE_CONNECT_TIMEOUT", "2")),
+        ),
+        event_hooks={"response": [_use_orjson_decoder]},
+    )
+    default_session.close()
+
+def get_supabase() -> Optional[Client]:
+    """Return the shared Supabase client, creating it once per process"""
+    global _supabase_client, _supabase_retry_at
+    if _supabase_client is not None:
+        return _supabase_client
+
+    _init()
+    # After a failed attempt, every `if not supabase:` check would otherwise retry create_client
+    # (and contend on the lock) for as long as the outage lasts
+    if time.monotonic() < _supabase_retry_at:
+        return None
+    with _supabase_lock:
+        if _supabase_client is None and SUPABASE_URL and SUPABASE_KEY and time.monotonic() >= _supabase_retry_at:
+            try:
+                logger.info("Connecting to Supabase at %s...", SUPABASE_URL[:20])
+                client = create_client(SUPABASE_URL, SUPABASE_KEY)
+                _configure_http_pool(client)
+                _supabase_client = client
+                logger.info("Successfully connected to Supabase")
+            except Exception as e:
+                logger.error("Failed to connect to Supabase: %s", e)
+                _supabase_retry_at = time.monotonic() + SUPABASE_RETRY_SECONDS
+    return _supabase_client
+
+class _LazySupabase:
+    """
+    Stand-in for the Supabase client that connects on first use.
+    Truthiness mirrors whether a client could be created, so `if not supabase:` checks keep working.
+    """
+
+    def __bool__(self) -> bool:
+        return get_supabase() is not None
+
+    def __getattr__(self, name):
+        client = get_supabase()
+        if client is None:
+            raise RuntimeError("Supabase client not initialized")
+        return getattr(client, name)
+
+supabase = _LazySupabase()
+
+PROFILE_BACKUP_PATH = 'profile_backup.json'
+
+def _write_profile_backup():
+    """Atomically write the in-memory profile to the backup file (compact; persist_profile.py writes it indented)"""
+    tmp_path = f"{PROFILE_BACKUP_PATH}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(orjson.dumps(in_memory_profile))
+    os.replace(tmp_path, PROFILE_BACKUP_PATH)
+
+# Populated from the backup file by _init(); updated in place so imported references stay valid
+in_memory_profile = DEFAULT_PROFILE.copy()
+
+def _load_profile_backup():
+    """Load the in-memory profile from the backup file if it exists"""
+    try:
+        if os.path.exists(PROFILE_BACKUP_PATH):
+            with open(PROFILE_BACKUP_PATH, 'rb') as f:
+                in_memory_profile.clear()
+                in_memory_profile.update(orjson.loads(f.read()))
+                logger.info("Loaded profile from backup file with name: %s", in_memory_profile.get('name', 'unknown'))
+        else:
+            logger.info("No backup file found, using default profile with name: %s", in_memory_profile.get('name', 'unknown'))
+            # Save the default profile to the backup file
+            _write_profile_backup()
+            logger.info("Created initial profile backup file")
+    except Exception as e:
+        logger.error("Error loading profile from backup: %s", e)
+        in_memory_profile.clear()
+        in_memory_profile.update(DEFAULT_PROFILE)
+        logger.warning("Using default profile after backup load error")
+
+
+# Fallback message log for when Supabase is unavailable. Bounded so it can't grow without limit;
+# CHAT_INMEM_CAP overrides the default size once _init() runs
+IN_MEMORY_MESSAGES_MAX = 10000
+# Most messages kept for any one conversation, so a single busy conversation can't push every other
+# conversation's history out of the log. Well above what a history lookup ever asks for.
+IN_MEMORY_MESSAGES_PER_CONVERSATION = 500
+in_memory_messages = collections.deque(maxlen=IN_MEMORY_MESSAGES_MAX)
+# Same messages grouped by conversation_id, so a history lookup only touches its own conversation.
+# Each deque drops its own oldest message once it reaches IN_MEMORY_MESSAGES_PER_CONVERSATION.
+_in_memory_messages_by_conversation: "Dict[str, collections.deque]" = {}
+_in_memory_messages_lock = threading.Lock()
+
+def _remember_messages(messages: List[Dict]) -> None:
+    """Add messages to the in-memory log and its per-conversation index, evicting the oldest when full"""
+    with _in_memory_messages_lock:
+        for msg in messages:
+            if len(in_memory_messages) == in_memory_messages.maxlen:
+                evicted = in_memory_messages.popleft()
+                conversation_messages = _in_memory_messages_by_conversation.get(evicted.get("conversation_id"))
+                if conversation_messages is not None:
+                    # Both logs are appended in the same order, so the evicted message is either at the
+                    # front of its conversation or was already dropped by the per-conversation cap
+                    if conversation_messages and conversation_messages[0] is evicted:
+                        conversation_messages.popleft()
+                    if not conversation_messages:
+                        del _in_memory_messages_by_conversation[evicted.get("conversation_id")]
+            in_memory_messages.append(msg)
+            conversation_messages = _in_memory_messages_by_conversation.get(msg.get("conversation_id"))
+            if conversation_messages is None:
+                conversation_messages = _in_memory_messages_by_conversation[msg.get("conversation_id")] = \
+                    collections.deque(maxlen=IN_MEMORY_MESSAGES_PER_CONVERSATION)
+            conversation_messages.append(msg)
 in_memory_chatbots = []
 
+# Profiles are read on every chat request but change rarely, so keep them for a short while per user.
+# update_profile_data drops the entry, so a user's own edits are visible immediately.
+# PROFILE_CACHE_TTL and PROFILE_CACHE_MAX_SIZE can be overridden from the environment once _init() runs.
+PROFILE_CACHE_TTL = 30.0
+PROFILE_CACHE_MAX_SIZE = 1024
+# Least recently used first, so eviction pops from the front
+_profile_cache: "collections.OrderedDict[str, Tuple[Dict, float]]" = collections.OrderedDict()
+_profile_cache_lock = threading.Lock()
+# Bumped by every invalidation. A read that started before a write must not cache the row it fetched,
+# or it could land after the write and serve the old profile for a full TTL.
+_profile_cache_epoch = 0
+
+def _cache_profile(user_id: str, profile: Dict, epoch: Optional[int] = None) -> None:
+    """
+    Remember a profile row for user_id, evicting the least recently used entry when full.
+    Pass the epoch observed before fetching the row; the row is dropped if an invalidation happened since.
+    Without an epoch the row is treated as freshly written, and reads still in flight are kept from replacing it.
+    """
+    global _profile_cache_epoch
+    with _profile_cache_lock:
+        if epoch is None:
+            _profile_cache_epoch += 1
+        elif epoch != _profile_cache_epoch:
+            return
+        _profile_cache[user_id] = (dict(profile), time.monotonic())
+        _profile_cache.move_to_end(user_id)
+        while len(_profile_cache) > PROFILE_CACHE_MAX_SIZE:
+            _profile_cache.popitem(last=False)
+
+def _get_cached_profile(user_id: str) -> Optional[Dict]:
+    """Copy of the cached profile for user_id, or None if missing or expired"""
+    with _profile_cache_lock:
+        cached = _profile_cache.get(user_id)
+        if cached:
+            _profile_cache.move_to_end(user_id)
+    if cached and time.monotonic() - cached[1] < PROFILE_CACHE_TTL:
+        # Callers are free to mutate what they get back. PROFILE_COLUMNS are all scalars,
+        # so a shallow copy is enough.
+        return dict(cached[0])
+    return None
+
+def _invalidate_profile_cache(user_id: Optional[str]) -> None:
+    """Forget the cached profile for user_id"""
+    global _profile_cache_epoch
+    with _profile_cache_lock:
+        _profile_cache_epoch += 1
+        _profile_cache.pop(user_id, None)
+
 def get_profile_data(user_id=None):
     """Get profile data from Supabase or fallback storage"""
     try:
@@ -89,220 +348,160 @@ def get_profile_data(user_id=None):
             logger.warning("No user_id provided to get_profile_data")
             return DEFAULT_PROFILE
         
-        logger.info(f"Getting profile data for user: {user_id}")
+        logger.debug("Getting profile data for user: %s", user_id)
+        
+        cached_profile = _get_cached_profile(user_id)
+        if cached_profile is not None:
+            return cached_profile
+        cache_epoch = _profile_cache_epoch
         
         # Query Supabase for the profile
-        profile_response = supabase.table("profiles").select("*").eq("user_id", user_id).execute()
+        # Not .maybe_single(): databases without migrations/ADD_PROFILES_USER_ID_UNIQUE.sql can hold duplicate
+        # rows per user, which maybe_single turns into an error (and a default profile) instead of a row
+        profile_response = supabase.table("profiles").select(PROFILE_COLUMNS).eq("user_id", user_id).limit(1).execute()
+        profile_data = _first_row(profile_response)
         
-        if profile_response.data and len(profile_response.data) > 0:
-            profile_data = profile_response.data[0]
-            logger.info(f"Found profile data: {profile_data}")
+        if profile_data is not None:
+            logger.debug("Found profile data: %s", profile_data)
             
             # Ensure name and location are not null
             if not profile_data.get("name"):
-                profile_data["name"] = DEFAULT_PROFILE.get("name", "")
+                profile_data["name"] = DEFAULT_PROFILE["name"]
             if not profile_data.get("location"):
-                profile_data["location"] = DEFAULT_PROFILE.get("location", "")
+                profile_data["location"] = DEFAULT_PROFILE["location"]
             
+            _cache_profile(user_id, profile_data, cache_epoch)
             return profile_data
         
         # No profile found for this user, create one
-        logger.info(f"No profile found for user_id {user_id}, creating new profile")
-        
-        # Create a new default profile for this user
-        new_profile = DEFAULT_PROFILE.copy()
-        
-        # Ensure name is set - if in_memory_profile has a custom name, use that
-        if in_memory_profile.get("name") and in_memory_profile.get("name") != DEFAULT_PROFILE.get("name"):
-            new_profile["name"] = in_memory_profile.get("name")
-            logger.info(f"Using in-memory profile name: {new_profile['name']}")
+        logger.info("No profile found for user_id %s, creating new profile", user_id)
         
-        # Ensure location is set - if in_memory_profile has a custom location, use that
-        if in_memory_profile.get("location") and in_memory_profile.get("location") != DEFAULT_PROFILE.get("location"):
-            new_profile["location"] = in_memory_profile.get("location")
-            logger.info(f"Using in-memory profile location: {new_profile['location']}")
-        
-        new_profile.update({
+        # Create a new default profile for this user in one merge; a custom name or location
+        # from in_memory_profile (anything other than the default or empty) takes precedence
+        now = _now_iso()
+        new_profile = {
+            **DEFAULT_PROFILE,
+            **{key: in_memory_profile[key] for key in ("name", "location")
+               if in_memory_profile.get(key) and in_memory_profile[key] != DEFAULT_PROFILE.get(key)},
             "user_id": user_id,
-            "created_at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
-            "updated_at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
-        })
+            "created_at": now,
+            "updated_at": now,
+        }
         
         try:
-            # First check if user exists in users table, if not create it
-            user_response = supabase.table("users").select("id").eq("id", user_id).execute()
-            if not user_response.data:
-                logger.info(f"User {user_id} not found in users table, creating it")
-                # Create user in users table
-                user_data = {
-                    "id": user_id,
-                    "username": f"user_{user_id[:8]}",
-                    "created_at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
-                    "updated_at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
-                }
-                supabase.table("users").upsert(user_data).execute()
+            # Make sure the user exists in the users table. ignore_duplicates turns this
+            # into INSERT ... ON CONFLICT DO NOTHING, so no existence SELECT is needed first.
+            user_data = {
+                "id": user_id,
+                "username": f"user_{user_id[:8]}",
+                "created_at": now,
+                "updated_at": now
+            }
+            supabase.table("users").upsert(user_data, ignore_duplicates=True).execute()
             
             # Try creating profile
             profile_response = supabase.table("profiles").insert(new_profile).execute()
             
-            if profile_response.data and len(profile_response.data) > 0:
-                logger.info(f"Created new profile for user_id {user_id}: {profile_response.data[0]['id']}")
-                created_profile = profile_response.data[0]
+            created_profile = _first_row(profile_response)
+            if created_profile is not None:
+                logger.info("Created new profile for user_id %s: %s", user_id, created_profile['id'])
+                _cache_profile(user_id, created_profile, cache_epoch)
                 return created_profile
             
-            logger.error(f"Failed to create profile in Supabase: {profile_response}")
+            logger.error("Failed to create profile in Supabase: %s", profile_response)
             # Fall back to in-memory profile with user_id
             
         except Exception as create_error:
-            logger.error(f"Error creating profile: {create_error}")
-            logger.error(f"Error trace: {traceback.format_exc()}")
+            logger.error("Error creating profile: %s", create_error)
+            logger.error("Error trace: %s", traceback.format_exc())
             # Fall back to in-memory profile with user_id
         
         # If we reach here, we need to return a fallback profile with the user_id
-        logger.warning(f"Using in-memory profile as fallback for user_id: {user_id}")
-        fallback_profile = in_memory_profile.copy()
-        fallback_profile["user_id"] = user_id
-        return fallback_profile
+        logger.warning("Using in-memory profile as fallback for user_id: %s", user_id)
+        return {**in_memory_profile, "user_id": user_id}
         
     except Exception as e:
-        logger.error(f"Error in get_profile_data: {e}")
-        logger.error(f"Error trace: {traceback.format_exc()}")
+        logger.error("Error in get_profile_data: %s", e)
+        logger.error("Error trace: %s", traceback.format_exc())
         return DEFAULT_PROFILE
 
-def save_profile_to_file():
-    """Save the in-memory profile to a file for persistence"""
-    try:
-        with open('profile_backup.json', 'w') as f:
-            json.dump(in_memory_profile, f, indent=2)
-        logger.info("Saved in-memory profile to file for persistence")
-    except Exception as e:
-        logger.error(f"Error saving profile to file: {e}")
-
 def update_profile_data(data, user_id=None):
     """
     Update the profile data in Supabase
     If user_id is provided, try to update the profile for that user
     """
     try:
-        # Add or update timestamps
-        data["updated_at"] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
-        if not data.get("created_at"):
-            data["created_at"] = data["updated_at"]
+        # created_at is left to the column default, so an upsert over an existing row keeps the original value
+        data["updated_at"] = _now_iso()
         
         # Check for user_id in data or use the provided user_id
         effective_user_id = data.get('user_id') or user_id
         
-        logger.info(f"Updating profile with data keys: {list(data.keys())}")
-        logger.info(f"User ID from parameter: {user_id}, User ID from data: {data.get('user_id')}")
-        logger.info(f"Effective user_id for profile update: {effective_user_id}")
+        logger.info("Updating profile with data keys: %s", list(data.keys()))
+        logger.info("User ID from parameter: %s, User ID from data: %s", user_id, data.get('user_id'))
+        logger.info("Effective user_id for profile update: %s", effective_user_id)
         
         # Filter out any fields that might not be in the schema
         # These are the known safe fields in our profiles table
-        safe_fields = ["id", "user_id", "bio", "skills", "experience", 
-                        "interests", "name", "location", 
-                        "created_at", "updated_at",
-                        "calendly_link", "meeting_rules", "profile_photo_url"]
+        safe_fields = _PROFILE_FIELD_SET
         
-        logger.debug(f"[DB Log] Safe fields for filtering: {safe_fields}")
+        logger.debug("[DB Log] Safe fields for filtering: %s", safe_fields)
 
         # Keep keys that are in safe_fields. Allow None for profile_photo_url as the column is nullable.
         # This ensures the key passes through if present in the incoming 'data' dict.
         filtered_data = {k: v for k, v in data.items() if k in safe_fields}
         
-        logger.info(f"Filtered profile data to: {list(filtered_data.keys())}")
-        logger.debug(f"[DB Log] Filtered data (full dictionary): {filtered_data}")
+        logger.info("Filtered profile data to: %s", list(filtered_data.keys()))
+        logger.debug("[DB Log] Filtered data (full dictionary): %s", filtered_data)
         
-        # Handle required fields
-        required_fields = ["bio", "skills", "experience", "interests"]
-        for field in required_fields:
-            if field not in filtered_data or filtered_data[field] is None or filtered_data[field] == "":
-                filtered_data[field] = DEFAULT_PROFILE.get(field, "Not specified")
-                logger.info(f"Using default value for required field: {field}")
+        # Fill empty required fields from DEFAULT_PROFILE in one update with a single log line.
+        # Name and location are never saved empty or whitespace-only either.
+        defaulted_fields = [field for field in _REQUIRED_PROFILE_FIELDS if not filtered_data.get(field)]
+        defaulted_fields += [field for field in ("name", "location") if not (filtered_data.get(field) or "").strip()]
+        if defaulted_fields:
+            filtered_data.update({field: DEFAULT_PROFILE[field] for field in defaulted_fields})
+            logger.info("Using default values for empty fields: %s", defaulted_fields)
         
-        # Ensure name and location are never empty strings or None
-        if not filtered_data.get("name") or filtered_data["name"].strip() == "":
-            filtered_data["name"] = DEFAULT_PROFILE.get("name", "Anonymous User")
-            logger.info(f"Using default name: {filtered_data['name']}")
-                
-        if not filtered_data.get("location") or filtered_data["location"].strip() == "":
-            filtered_data["location"] = DEFAULT_PROFILE.get("location", "Unknown Location")
-            logger.info(f"Using default location: {filtered_data['location']}")
+        _invalidate_profile_cache(effective_user_id)
         
         if supabase:
-            logger.info(f"Attempting to update profile in Supabase")
+            logger.info("Attempting to update profile in Supabase")
             
             if effective_user_id:
-                # First check if this user exists in the users table by trying to get their auth data
-                logger.info(f"Checking if user exists in Supabase auth/users")
+                # Insert or update in one atomic statement keyed on the UNIQUE(user_id) constraint,
+                # so there is no SELECT first and no race between two first-time saves.
+                filtered_data["user_id"] = effective_user_id
+                filtered_data.pop("id", None)
+                logger.info("Upserting profile for user: %s", effective_user_id)
+                logger.debug("Upsert payload: %s", filtered_data)
                 try:
-                    # If the user was created through Supabase Auth, they should exist in auth.users
-                    # So we'll directly try to create the user in our users table without checking first
-                    user_data = {
-                        "id": effective_user_id,
-                        "username": filtered_data.get("name") or f"user_{effective_user_id[:8]}",
-                        "created_at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
-                        "updated_at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
-                    }
-                    # Use upsert instead of insert to handle both new and existing users
-                    user_response = supabase.table("users").upsert(user_data).execute()
-                    logger.info(f"Upserted user in users table: {user_response.data}")
-                except Exception as user_error:
-                    logger.error(f"Error upserting user in users table: {user_error}")
-                    # If this fails, it could be permissions or it could be that the auth.users record doesn't exist
-                    # We'll continue anyway and try to create/update the profile
-                
-                # Now check if user already has a profile
-                logger.info(f"Checking for existing profile with user_id: {effective_user_id}")
-                response = supabase.table("profiles").select("id").eq("user_id", effective_user_id).execute()
-                logger.info(f"Found profiles matching user_id: {response.data}")
-                existing_profile = None if not response.data else response.data[0]
-                
-                if existing_profile:
-                    # Update existing profile
-                    profile_id = existing_profile["id"]
-                    filtered_data["id"] = profile_id
-                    filtered_data["user_id"] = effective_user_id
-                    
-                    logger.info(f"Updating existing profile with ID: {profile_id} for user: {effective_user_id}")
-                    logger.info(f"Update payload: {filtered_data}")
                     try:
-                        response = supabase.table("profiles").update(filtered_data).eq("id", profile_id).execute()
-                        logger.info(f"Update response: {response.data}")
-                        if response.data:
-                            logger.info("Successfully updated profile in Supabase")
-                            # No need to fall back to in-memory profile
-                            result = response.data[0]
-                            return result
-                        else:
-                            logger.error(f"Failed to update profile in Supabase: {response}")
-                            # Continue to in-memory fallback
-                    except Exception as update_error:
-                        logger.error(f"Error during profile update: {update_error}")
-                        logger.error(f"Error trace: {traceback.format_exc()}")
-                        # Continue to in-memory fallback
-                        return None # Return None on failure
-                else:
-                    # Create new profile for the user
-                    logger.info(f"Creating new profile for user: {effective_user_id}")
-                    filtered_data["user_id"] = effective_user_id
-                    logger.info(f"Insert payload: {filtered_data}")
-                    try:
-                        response = supabase.table("profiles").insert(filtered_data).execute()
-                        logger.info(f"Insert response: {response.data}")
-                        if response.data:
-                            logger.info("Successfully created profile in Supabase")
-                            # No need to fall back to in-memory profile
-                            save_profile_to_file()  # Still save for backup
-                            result = response.data[0]
-                            return result
-                        else:
-                            logger.error(f"Failed to create profile in Supabase: {response}")
-                            # Continue to in-memory fallback
-                    except Exception as insert_error:
-                        logger.error(f"Error during profile creation: {insert_error} for payload {filtered_data}")
-                        logger.error(f"Error trace: {traceback.format_exc()}")
-                        # Continue to in-memory fallback
-                        return None # Return None on failure
+                        response = supabase.table("profiles").upsert(filtered_data, on_conflict="user_id").execute()
+                    except Exception as upsert_error:
+                        # 23503 = foreign_key_violation: a brand-new profile needs its users row first
+                        if getattr(upsert_error, "code", None) != "23503":
+                            raise
+                        logger.info("User %s missing from users table, creating it", effective_user_id)
+                        user_data = {
+                            "id": effective_user_id,
+                            "username": filtered_data.get("name") or f"user_{effective_user_id[:8]}",
+                            "created_at": data["updated_at"],
+                            "updated_at": data["updated_at"]
+                        }
+                        supabase.table("users").upsert(user_data).execute()
+                        response = supabase.table("profiles").upsert(filtered_data, on_conflict="user_id").execute()
+
+                    logger.debug("Upsert response: %s", response.data)
+                    if response.data:
+                        logger.info("Successfully saved profile in Supabase")
+                        # The upsert already returns the stored row, so the next read needs no SELECT
+                        _cache_profile(effective_user_id, response.data[0])
+                        return response.data[0]
+                    logger.error("Failed to save profile in Supabase: %s", response)
+                except Exception as upsert_error:
+                    logger.error("Error during profile upsert: %s for payload %s", upsert_error, filtered_data)
+                    logger.error("Error trace: %s", traceback.format_exc())
+                    return None # Return None on failure
             
             if not effective_user_id:
                 logger.warning("No user_id provided, profile will not be created in database")
@@ -312,32 +511,80 @@ def update_profile_data(data, user_id=None):
         logger.error("Failed to update profile in Supabase and Supabase is required.")
         return None 
     except Exception as e:
-        logger.error(f"Error updating profile: {e}")
-        logger.error(f"Error trace: {traceback.format_exc()}")
+        logger.error("Error updating profile: %s", e)
+        logger.error("Error trace: %s", traceback.format_exc())
         return None
 
+# (lookup kind, value) -> (chatbot row, cached_at), where kind is "user" (a user's default chatbot),
+# "id" or "slug". Every chat request resolves its chatbot through one of these; update_chatbot_config
+# drops all of a user's entries so config and slug changes show up immediately in this worker.
+# Other workers only see them once their entry expires, so the TTL is kept short.
+CHATBOT_CACHE_TTL = 15
+CHATBOT_CACHE_MAX_SIZE = 4096
+_chatbot_cache: Dict[Tuple[str, str], Tuple[Dict, float]] = {}
+_chatbot_cache_lock = threading.Lock()
+# Bumped by every invalidation, like _profile_cache_epoch: a lookup that read the row before an update
+# must not cache it after the update has been invalidated.
+_chatbot_cache_epoch = 0
+
+def _cache_chatbot(key: Tuple[str, str], chatbot: Dict, epoch: int) -> None:
+    """
+    Remember the chatbot row a lookup resolved to.
+    Pass the epoch observed before fetching the row; the row is dropped if an invalidation happened since.
+    """
+    now = time.monotonic()
+    with _chatbot_cache_lock:
+        if epoch != _chatbot_cache_epoch:
+            return
+        if len(_chatbot_cache) >= CHATBOT_CACHE_MAX_SIZE:
+            expired = [cache_key for cache_key, (_, cached_at) in _chatbot_cache.items()
+                       if now - cached_at >= CHATBOT_CACHE_TTL]
+            for cache_key in expired:
+                del _chatbot_cache[cache_key]
+            if len(_chatbot_cache) >= CHATBOT_CACHE_MAX_SIZE:
+                _chatbot_cache.clear()
+        _chatbot_cache[key] = (dict(chatbot), now)
+
+def _get_cached_chatbot(key: Tuple[str, str]) -> Optional[Dict]:
+    """Copy of the cached chatbot for a lookup key, or None if missing or expired"""
+    with _chatbot_cache_lock:
+        cached = _chatbot_cache.get(key)
+    if cached and time.monotonic() - cached[1] < CHATBOT_CACHE_TTL:
+        return dict(cached[0])
+    return None
+
+def _invalidate_user_chatbot_cache(user_id: Optional[str]) -> None:
+    """Forget every cached lookup that resolved to one of user_id's chatbots"""
+    global _chatbot_cache_epoch
+    with _chatbot_cache_lock:
+        _chatbot_cache_epoch += 1
+        stale = [key for key, (chatbot, _) in _chatbot_cache.items()
+                 if key == ("user", user_id) or chatbot.get("user_id") == user_id]
+        for key in stale:
+            del _chatbot_cache[key]
+
 def get_user_chatbots(user_id: str) -> List[Dict]:
     """Get all chatbots associated with a specific user ID."""
     if not supabase or not user_id:
-        logger.warning(f"Cannot get chatbots - Supabase not connected or no user_id: {user_id}")
+        logger.warning("Cannot get chatbots - Supabase not connected or no user_id: %s", user_id)
         return []
     try:
-        logger.info(f"Fetching chatbots for user_id: {user_id}")
+        logger.info("Fetching chatbots for user_id: %s", user_id)
         response = supabase.table("chatbots").select("*").eq("user_id", user_id).execute()
 
         if response.data:
-            logger.info(f"Found {len(response.data)} chatbots for user {user_id}")
+            logger.info("Found %s chatbots for user %s", len(response.data), user_id)
             # Ensure configuration is a dict, default to empty if null/invalid
             for bot in response.data:
                 if not isinstance(bot.get('configuration'), dict):
                     bot['configuration'] = {}
             return response.data
         else:
-            logger.info(f"No chatbots found for user {user_id}")
+            logger.info("No chatbots found for user %s", user_id)
             return []
 
     except Exception as e:
-        logger.error(f"Error fetching chatbots for user {user_id}: {e}")
+        logger.error("Error fetching chatbots for user %s: %s", user_id, e)
         logger.error(traceback.format_exc())
         return []
 
@@ -348,17 +595,17 @@ def update_chatbot_config(chatbot_id: str, configuration: Dict, user_id: str, pu
         return None
 
     try:
-        logger.info(f"Updating configuration for chatbot_id: {chatbot_id} by user_id: {user_id}")
+        logger.info("Updating configuration for chatbot_id: %s by user_id: %s", chatbot_id, user_id)
         
         # Prepare the update data
         update_data = {
             "configuration": configuration,
-            "updated_at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+            "updated_at": _now_iso()
         }
         
         # Add public_url_slug to update data if provided
         if public_url_slug is not None:
-            logger.info(f"Setting public_url_slug to: {public_url_slug}")
+            logger.info("Setting public_url_slug to: %s", public_url_slug)
             update_data["public_url_slug"] = public_url_slug
         
         # Update the specific chatbot owned by the user
@@ -368,22 +615,26 @@ def update_chatbot_config(chatbot_id: str, configuration: Dict, user_id: str, pu
             .eq("user_id", user_id) \
             .execute()
 
+        # Only after the write: a lookup racing with it either sees the new row or has its
+        # stale one dropped here or refused by the epoch check in _cache_chatbot
+        _invalidate_user_chatbot_cache(user_id)
+
         if response.data:
-            logger.info(f"Successfully updated chatbot {chatbot_id}: {response.data[0]}")
+            logger.debug("Successfully updated chatbot %s: %s", chatbot_id, response.data[0])
             updated_bot = response.data[0]
             # Ensure configuration is dict
             if not isinstance(updated_bot.get('configuration'), dict):
                  updated_bot['configuration'] = {}
             return updated_bot
         elif len(response.data) == 0:
-             logger.warning(f"No chatbot found with id {chatbot_id} owned by user {user_id} to update.")
+             logger.warning("No chatbot found with id %s owned by user %s to update.", chatbot_id, user_id)
              return None # Or raise 404?
         else:
-            logger.error(f"Error updating chatbot config for {chatbot_id}: {response}")
+            logger.error("Error updating chatbot config for %s: %s", chatbot_id, response)
             return None
 
     except Exception as e:
-        logger.error(f"Exception updating chatbot config for {chatbot_id}: {e}")
+        logger.error("Exception updating chatbot config for %s: %s", chatbot_id, e)
         logger.error(traceback.format_exc())
         return None
 
@@ -396,54 +647,69 @@ def get_or_create_chatbot(user_id=None, chatbot_id=None, slug=None):
         if not supabase:
             return None
 
+        cache_epoch = _chatbot_cache_epoch
+
         if chatbot_id:
             # Get specific chatbot by ID
-            response = supabase.table("chatbots").select("*").eq("id", chatbot_id).execute()
-            if response.data and len(response.data) > 0:
-                return response.data[0]
+            cached_chatbot = _get_cached_chatbot(("id", chatbot_id))
+            if cached_chatbot is not None:
+                return cached_chatbot
+            response = supabase.table("chatbots").select("*").eq("id", chatbot_id).maybe_single().execute()
+            chatbot = _first_row(response)
+            if chatbot is not None:
+                _cache_chatbot(("id", chatbot_id), chatbot, cache_epoch)
+                return chatbot
         
         if slug:
             # Get chatbot by slug - this ONLY gets, doesn't create
-            logger.info(f"Looking up chatbot by slug: {slug}")
-            response = supabase.table("chatbots").select("*").eq("public_url_slug", slug).execute()
-            if response.data and len(response.data) > 0:
-                logger.info(f"Found chatbot with id {response.data[0].get('id')} for slug: {slug}")
-                return response.data[0]
+            cached_chatbot = _get_cached_chatbot(("slug", slug))
+            if cached_chatbot is not None:
+                return cached_chatbot
+            logger.info("Looking up chatbot by slug: %s", slug)
+            response = supabase.table("chatbots").select("*").eq("public_url_slug", slug).maybe_single().execute()
+            chatbot = _first_row(response)
+            if chatbot is not None:
+                logger.info("Found chatbot with id %s for slug: %s", chatbot.get('id'), slug)
+                _cache_chatbot(("slug", slug), chatbot, cache_epoch)
+                return chatbot
             else:
-                logger.warning(f"No chatbot found with slug: {slug}")
+                logger.warning("No chatbot found with slug: %s", slug)
                 return None
         
         if user_id:
+            cached_chatbot = _get_cached_chatbot(("user", user_id))
+            if cached_chatbot is not None:
+                return cached_chatbot
+
             # Get user's default chatbot or create one
-            response = supabase.table("chatbots").select("*").eq("user_id", user_id).execute()
+            response = supabase.table("chatbots").select("*").eq("user_id", user_id).limit(1).execute()
+            chatbot = _first_row(response)
             
-            if response.data and len(response.data) > 0:
+            if chatbot is not None:
                 # User already has a chatbot
-                return response.data[0]
+                _cache_chatbot(("user", user_id), chatbot, cache_epoch)
+                return chatbot
             else:
-                # Create a default chatbot for the user
+                # Create a default chatbot for the user; id and timestamps come from the column defaults
                 chatbot_data = {
                     "user_id": user_id,
                     "name": "My AI Assistant",
                     "description": "Personal AI chatbot",
                     "is_public": True,
-                    "public_url_slug": f"user-{user_id[:8]}",
-                    "created_at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
-                    "updated_at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+                    "public_url_slug": f"user-{user_id[:8]}"
                 }
                 
                 response = supabase.table("chatbots").insert(chatbot_data).execute()
-                if response.data and len(response.data) > 0:
-                    return response.data[0]
+                chatbot = _first_row(response)
+                if chatbot is not None:
+                    _cache_chatbot(("user", user_id), chatbot, cache_epoch)
+                    return chatbot
         
         # Return default chatbot if none found and no user_id provided
         response = supabase.table("chatbots").select("*").limit(1).execute()
-        if response.data and len(response.data) > 0:
-            return response.data[0]
-            
-        return None
+        return _first_row(response)
     except Exception as e:
-        logger.error(f"Error getting or creating chatbot: {e}")
+        logger.error("Error getting or creating chatbot: %s", e)
         return None
 
 def get_or_create_visitor(visitor_id, visitor_name=None):
@@ -458,50 +724,99 @@ def get_or_create_visitor(visitor_id, visitor_name=None):
             return None
         
         # Check if visitor already exists using visitor_id field (TEXT) from frontend
-        response = supabase.table("visitors").select("*").eq("visitor_id", visitor_id).execute()
+        response = supabase.table("visitors").select("id,name").eq("visitor_id", visitor_id).maybe_single().execute()
+        visitor = _first_row(response)
         
-        if response.data and len(response.data) > 0:
+        if visitor is not None:
             # Update last_seen timestamp and name if provided
-            visitor = response.data[0]
-            update_data = {"last_seen": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())}
+            update_data = {"last_seen": _now_iso()}
             
             if visitor_name and not visitor.get("name"):
                 update_data["name"] = visitor_name
             
             update_response = supabase.table("visitors").update(update_data).eq("id", visitor["id"]).execute()
             
-            if update_response.data and len(update_response.data) > 0:
-                return update_response.data[0]
-            return visitor
+            return _first_row(update_response) or visitor
         
-        # Create new visitor with TEXT visitor_id 
+        # Create new visitor with TEXT visitor_id; first_seen/last_seen default to NOW() in the table
         visitor_data = {
             "visitor_id": visitor_id,  # This is the frontend-generated text ID
-            "name": visitor_name or "",  # Use empty string if name is not provided
-            "first_seen": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
-            "last_seen": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+            "name": visitor_name or ""  # Use empty string if name is not provided
         }
         
         response = supabase.table("visitors").insert(visitor_data).execute()
+        visitor = _first_row(response)
         
-        if response.data and len(response.data) > 0:
-            logger.info(f"Successfully created new visitor with DB ID: {response.data[0]['id']}")
-            return response.data[0]
+        if visitor is not None:
+            logger.info("Successfully created new visitor with DB ID: %s", visitor['id'])
+            return visitor
         
         return None
     except Exception as e:
-        logger.error(f"Error getting or creating visitor: {e}")
-        logger.error(f"Error trace: {traceback.format_exc()}")
+        logger.error("Error getting or creating visitor: %s", e)
+        logger.error("Error trace: %s", traceback.format_exc())
         return None
 
-def get_or_create_conversation(chatbot_id: str, visitor_id: str) -> str:
-    """Finds an existing conversation or creates a new one for a given chatbot and visitor."""
+# conversation_id -> (chatbot_id, cached_at). A conversation never moves to another chatbot;
+# the TTL only keeps finished conversations from piling up in the cache.
+CONVERSATION_CACHE_TTL = 300
+CONVERSATION_CACHE_MAX_SIZE = 10000
+_conversation_chatbot_cache: Dict[str, Tuple[str, float]] = {}
+_conversation_cache_lock = threading.Lock()
+
+def _cache_conversation_chatbot(conversation_id: str, chatbot_id: str) -> None:
+    """Remember which chatbot a conversation belongs to"""
+    now = time.monotonic()
+    with _conversation_cache_lock:
+        if len(_conversation_chatbot_cache) >= CONVERSATION_CACHE_MAX_SIZE:
+            expired = [key for key, (_, cached_at) in _conversation_chatbot_cache.items()
+                       if now - cached_at >= CONVERSATION_CACHE_TTL]
+            for key in expired:
+                del _conversation_chatbot_cache[key]
+            if len(_conversation_chatbot_cache) >= CONVERSATION_CACHE_MAX_SIZE:
+                _conversation_chatbot_cache.clear()
+        _conversation_chatbot_cache[conversation_id] = (chatbot_id, now)
+
+def _get_conversation_chatbot_id(conversation_id: str) -> str:
+    """Get the chatbot_id for a conversation, hitting Supabase only on a cache miss"""
+    with _conversation_cache_lock:
+        cached = _conversation_chatbot_cache.get(conversation_id)
+    if cached and time.monotonic() - cached[1] < CONVERSATION_CACHE_TTL:
+        return cached[0]
+
+    # Query conversations table to get chatbot_id based on conversation_id
+    conv_data_response = (supabase.table("conversations")
+        .select("chatbot_id")
+        .eq("id", conversation_id)
+        .maybe_single()
+        .execute())
+    conversation = _first_row(conv_data_response)
+
+    if conversation is None:
+        logger.error("Could not find conversation with ID: %s to get chatbot_id.", conversation_id)
+        raise ValueError(f"Conversation not found: {conversation_id}")
+
+    chatbot_id = conversation.get("chatbot_id")
+    if not chatbot_id:
+        logger.error("Chatbot ID not found in conversation record: %s", conversation_id)
+        raise ValueError("Chatbot ID missing from conversation record")
+
+    chatbot_id = str(chatbot_id)
+    _cache_conversation_chatbot(conversation_id, chatbot_id)
+    return chatbot_id
+
+def get_or_create_conversation(chatbot_id: str, visitor_id: str, owner_user_id: Optional[str] = None) -> str:
+    """
+    Finds an existing conversation or creates a new one for a given chatbot and visitor.
+    Pass owner_user_id when the caller already has the chatbot row, so creating a conversation
+    doesn't need to look the owner up again.
+    """
     if not supabase:
         logger.error("Supabase client not initialized. Cannot manage conversations.")
         raise ConnectionError("Database connection not available")
     
     if not chatbot_id or not visitor_id:
-        logger.error(f"Chatbot ID ({chatbot_id}) and Visitor ID ({visitor_id}) are required to get/create conversation.")
+        logger.error("Chatbot ID (%s) and Visitor ID (%s) are required to get/create conversation.", chatbot_id, visitor_id)
         raise ValueError("Chatbot ID and Visitor ID cannot be null")
 
     try:
@@ -510,10 +825,10 @@ def get_or_create_conversation(chatbot_id: str, visitor_id: str) -> str:
             chatbot_uuid = uuid.UUID(chatbot_id)
             visitor_uuid = uuid.UUID(visitor_id)
         except ValueError as e:
-            logger.error(f"Invalid UUID format for chatbot_id or visitor_id: {e}")
+            logger.error("Invalid UUID format for chatbot_id or visitor_id: %s", e)
             raise ValueError(f"Invalid UUID format: {e}")
 
-        logger.info(f"Looking for conversation with chatbot_id={chatbot_uuid} and visitor_id={visitor_uuid}")
+        logger.info("Looking for conversation with chatbot_id=%s and visitor_id=%s", chatbot_uuid, visitor_uuid)
         
         # 1. Look for existing conversation
         conv_response = supabase.table("conversations") \
@@ -525,24 +840,28 @@ def get_or_create_conversation(chatbot_id: str, visitor_id: str) -> str:
 
         if conv_response.data:
             conversation_id = conv_response.data[0]["id"]
-            logger.info(f"Found existing conversation: {conversation_id}")
+            logger.info("Found existing conversation: %s", conversation_id)
+            _cache_conversation_chatbot(str(conversation_id), str(chatbot_uuid))
             return str(conversation_id)
         else:
             logger.info("No existing conversation found. Creating a new one.")
             
-            # 2. Get chatbot owner's user_id
-            chatbot_response = supabase.table("chatbots") \
-                .select("user_id") \
-                .eq("id", str(chatbot_uuid)) \
-                .limit(1) \
-                .execute()
+            # 2. Get chatbot owner's user_id, unless the caller already knows it
+            chatbot_owner_user_id = owner_user_id
+            if not chatbot_owner_user_id:
+                chatbot_response = supabase.table("chatbots") \
+                    .select("user_id") \
+                    .eq("id", str(chatbot_uuid)) \
+                    .maybe_single() \
+                    .execute()
+                chatbot_row = _first_row(chatbot_response)
 
-            if not chatbot_response.data:
-                logger.error(f"Chatbot with ID {chatbot_uuid} not found.")
-                raise ValueError(f"Chatbot not found: {chatbot_uuid}")
-            
-            chatbot_owner_user_id = chatbot_response.data[0]["user_id"]
-            logger.info(f"Found chatbot owner user_id: {chatbot_owner_user_id}")
+                if chatbot_row is None:
+                    logger.error("Chatbot with ID %s not found.", chatbot_uuid)
+                    raise ValueError(f"Chatbot not found: {chatbot_uuid}")
+                
+                chatbot_owner_user_id = chatbot_row["user_id"]
+                logger.info("Found chatbot owner user_id: %s", chatbot_owner_user_id)
 
             # 3. Create new conversation
             new_conv_data = {
@@ -558,10 +877,11 @@ def get_or_create_conversation(chatbot_id: str, visitor_id: str) -> str:
 
             if insert_response.data:
                 new_conversation_id = insert_response.data[0]["id"]
-                logger.info(f"Successfully created new conversation: {new_conversation_id}")
+                logger.info("Successfully created new conversation: %s", new_conversation_id)
+                _cache_conversation_chatbot(str(new_conversation_id), str(chatbot_uuid))
                 return str(new_conversation_id)
             else:
-                logger.error(f"Failed to insert new conversation: {insert_response.error}")
+                logger.error("Failed to insert new conversation: %s", insert_response.error)
                 # Attempt to refetch in case of race condition
                 time.sleep(0.5) 
                 refetch_response = supabase.table("conversations") \
@@ -576,17 +896,45 @@ def get_or_create_conversation(chatbot_id: str, visitor_id: str) -> str:
                    raise Exception(f"Failed to create or retrieve conversation after insert attempt: {insert_response.error}")
 
     except Exception as e:
-        logger.error(f"Error getting or creating conversation: {e}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Error getting or creating conversation: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
         raise e
 
+def _build_message_payload(conversation_id: str, chatbot_id: Optional[str], message: Optional[str], sender: Optional[str],
+                           response: Optional[str], metadata: Optional[Dict]) -> Dict:
+    """
+    The messages row for one chat turn, used both for the insert and the in-memory fallback.
+    messages.message is NOT NULL, so it is normalised here rather than found out at insert time.
+    The id is assigned here, so the insert doesn't need to send the row back. created_at and timestamp
+    are left to the column defaults: history is paged by (created_at, id) and the ids are random, so
+    created_at needs Postgres' microsecond precision, not _now_iso()'s whole seconds, to keep turns in order.
+    """
+    return {
+        "id": str(uuid.uuid4()),
+        "conversation_id": conversation_id,
+        "chatbot_id": chatbot_id,
+        "message": message if message is not None else "",
+        "response": response,
+        "sender": sender or "user",
+        "metadata": metadata or {},
+    }
+
+def _stamp_unsaved_message(message_data: Dict) -> Dict:
+    """Copy of a messages row that only goes to the in-memory log, with the timestamps the database would add"""
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    return {**message_data, "created_at": now, "timestamp": now}
+
 def log_chat_message(conversation_id: str, message: str, sender="user", response: Optional[str] = None, metadata: Optional[Dict] = None):
-    """Logs a message and its response to the database, linked to a conversation."""
+    """
+    Logs a message and its response to the database, linked to a conversation.
+    Returns [message_data] including its id once the row is saved. If the insert fails the row is
+    kept in the in-memory log (get_chat_history still returns it) and None is returned.
+    """
     try:
         if not supabase:
-            logger.error("Supabase client not initialized. Cannot log chat messages.")
-            # Optional: Fallback to in-memory logging if needed
-            # in_memory_messages.append({"message": message, "response": response, "timestamp": time.time(), "sender": sender, "conversation_id": conversation_id})
+            logger.error("Supabase client not initialized. Keeping chat message in memory only.")
+            _remember_messages([_stamp_unsaved_message(
+                _build_message_payload(conversation_id, None, message, sender, response, metadata))])
             return None
         
         if not conversation_id:
@@ -595,76 +943,108 @@ def log_chat_message(conversation_id: str, message: str, sender="user", response
         try:
             # Validate conversation_id is a UUID
             conversation_uuid = uuid.UUID(conversation_id)
-            logger.info(f"Valid conversation UUID: {conversation_uuid}")
+            logger.debug("Valid conversation UUID: %s", conversation_uuid)
         except ValueError:
-            logger.error(f"Invalid UUID format for conversation_id: {conversation_id}")
+            logger.error("Invalid UUID format for conversation_id: %s", conversation_id)
             raise ValueError("Invalid conversation_id format.")
 
         # --- Get chatbot_id from conversation ---
         try:
-            # Query conversations table to get chatbot_id based on conversation_id
-            conv_data_response = (supabase.table("conversations")
-                .select("chatbot_id")
-                .eq("id", str(conversation_uuid))
-                .limit(1)
-                .execute())
-
-            if not conv_data_response.data:
-                logger.error(f"Could not find conversation with ID: {conversation_uuid} to get chatbot_id.")
-                raise ValueError(f"Conversation not found: {conversation_uuid}")
-
-            chatbot_id = conv_data_response.data[0].get("chatbot_id")
-            if not chatbot_id:
-                 logger.error(f"Chatbot ID not found in conversation record: {conversation_uuid}")
-                 raise ValueError("Chatbot ID missing from conversation record")
-
-            logger.info(f"Found chatbot_id {chatbot_id} for conversation {conversation_uuid}")
+            chatbot_id = _get_conversation_chatbot_id(str(conversation_uuid))
+            logger.debug("Found chatbot_id %s for conversation %s", chatbot_id, conversation_uuid)
 
         except Exception as conv_lookup_err:
-             logger.error(f"Error looking up chatbot_id for conversation {conversation_uuid}: {conv_lookup_err}")
+             logger.error("Error looking up chatbot_id for conversation %s: %s", conversation_uuid, conv_lookup_err)
              raise conv_lookup_err
         # --- End Get chatbot_id ---
 
-        message_data = {
-            "conversation_id": str(conversation_uuid),
-            "chatbot_id": str(chatbot_id),
-            "message": message,
-            "response": response,
-            "sender": sender,
-            "metadata": metadata or {},
-            "created_at": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
-            "timestamp": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()) # Keep timestamp for potential compatibility? Check schema.sql
-            # Removed direct chatbot_id, visitor_id - these are in the conversation table
-        }
+        message_data = _build_message_payload(
+            str(conversation_uuid), str(chatbot_id), message, sender, response, metadata)
         
-        logger.info(f"Logging message for conversation_id: {conversation_id}")
-        logger.info(f"Message data: {json.dumps(message_data, default=str)}")
+        logger.info("Logging message for conversation_id: %s", conversation_id)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Message data: %s", orjson.dumps(message_data, default=str).decode())
         
-        insert_response = supabase.table("messages").insert(message_data).execute()
-
-        # Check the response to verify insertion
-        if insert_response and insert_response.data and len(insert_response.data) > 0:
-            logger.info(f"Message saved successfully with ID: {insert_response.data[0].get('id', 'unknown')}")
-            logger.info(f"Saved with conversation_id: {insert_response.data[0].get('conversation_id', 'missing')}")
-            return insert_response.data # Return the inserted data
-        else:
-            logger.warning(f"Message insertion response didn't include expected data: {insert_response}")
-            return None # Return None on failure or no data
+        try:
+            # Prefer: return=minimal - the id is already known, so the row doesn't need to come back.
+            # Failures still raise, so reaching the return means the row is committed.
+            supabase.table("messages").insert(message_data, returning=ReturnMethod.minimal).execute()
+        except Exception as insert_error:
+            logger.error("Error saving chat message, keeping it in memory: %s", insert_error)
+            _remember_messages([_stamp_unsaved_message(message_data)])
+            return None
+        logger.info("Message saved successfully with ID: %s", message_data["id"])
+        return [message_data]
 
     except Exception as e:
-        logger.error(f"Error logging chat message: {e}")
+        logger.error("Error logging chat message: %s", e)
         logger.error(traceback.format_exc())
         return None # Return None on exception
 
-def get_chat_history(conversation_id: str, limit: int = 50):
-    """Gets chat history for a specific conversation from Supabase."""
+def _message_sort_key(msg: Dict) -> Tuple[datetime.datetime, str]:
+    """(created_at, id) of a message: the order history is paged in, matching ORDER BY created_at, id"""
+    return _parse_timestamp(msg["created_at"]), str(msg.get("id"))
+
+def _merge_unsaved_messages(conversation_id: str, newest_first: List[Dict], limit: int,
+                            cursor: Optional[Tuple[datetime.datetime, str]] = None) -> List[Dict]:
+    """
+    Add messages whose insert failed (kept only in the in-memory log) to a page of stored history,
+    newest first, so they don't silently drop out of the conversation while the database is up
+    """
+    with _in_memory_messages_lock:
+        unsaved = list(_in_memory_messages_by_conversation.get(conversation_id, ()))
+    if not unsaved:
+        return newest_first
+    if cursor:
+        unsaved = [msg for msg in unsaved if _message_sort_key(msg) < cursor]
+    stored_ids = {row.get("id") for row in newest_first}
+    merged = newest_first + [msg for msg in unsaved if msg["id"] not in stored_ids]
+    merged.sort(key=_message_sort_key, reverse=True)
+    return merged[:limit]
+
+def parse_history_cursor(before: Optional[str], before_id: Optional[str]) -> Optional[Tuple[datetime.datetime, str]]:
+    """
+    Turn the before/before_id query values into a (created_at, id) cursor, or None for the newest page.
+    Normalised so "Z" and "+00:00" timestamps compare alike and only a well-formed timestamp and uuid
+    ever reach a filter string. Raises ValueError for a malformed cursor, or before_id without before.
+    """
+    if not before:
+        if before_id:
+            raise ValueError("before_id requires before")
+        return None
+    try:
+        cursor_ts = _parse_timestamp(before)
+    except ValueError:
+        raise ValueError(f"Invalid before timestamp: {before}")
+    try:
+        cursor_id = str(uuid.UUID(before_id)) if before_id else ""
+    except ValueError:
+        raise ValueError(f"Invalid before_id: {before_id}")
+    return cursor_ts, cursor_id
+
+def get_chat_history(conversation_id: str, limit: int = 50, before: Optional[str] = None,
+                     before_id: Optional[str] = None):
+    """
+    Gets the most recent chat history for a conversation from Supabase, oldest message first.
+    For older pages pass before=<created_at> and before_id=<id> of the first message of the previous page
+    (keyset pagination). Messages are ordered by (created_at, id), so rows sharing the boundary
+    timestamp are neither skipped nor repeated; without before_id every row at `before` is skipped.
+    Raises ValueError for a malformed cursor (see parse_history_cursor) instead of returning no messages.
+    """
+    cursor = parse_history_cursor(before, before_id)
     try:
-        if not supabase:
-            logger.error("Supabase client not initialized. Cannot get chat history.")
-            # Optional: Fallback to in-memory filtering if needed
-            # relevant_messages = [m for m in in_memory_messages if m.get('conversation_id') == conversation_id]
-            # return relevant_messages[-limit:]
+        if limit <= 0:
             return []
+
+        if not supabase:
+            logger.error("Supabase client not initialized. Serving chat history from memory.")
+            # The log is in append (= chronological) order, so the newest are at the end
+            with _in_memory_messages_lock:
+                newest_first = reversed(_in_memory_messages_by_conversation.get(conversation_id, ()))
+                if cursor:
+                    newest_first = (msg for msg in newest_first if _message_sort_key(msg) < cursor)
+                recent_messages = list(itertools.islice(newest_first, limit))
+            return recent_messages[::-1]
         
         if not conversation_id:
              logger.error("No conversation_id provided to get_chat_history")
@@ -673,63 +1053,116 @@ def get_chat_history(conversation_id: str, limit: int = 50):
         try:
             # Validate conversation_id is a UUID
             conversation_uuid = uuid.UUID(conversation_id)
-            logger.info(f"Valid conversation UUID: {conversation_uuid}")
+            logger.debug("Valid conversation UUID: %s", conversation_uuid)
         except ValueError:
-            logger.error(f"Invalid UUID format for conversation_id: {conversation_id}")
+            logger.error("Invalid UUID format for conversation_id: %s", conversation_id)
             raise ValueError("Invalid conversation_id format.")
 
-        logger.info(f"Fetching chat history for conversation_id: {conversation_id}, limit: {limit}")
+        logger.info("Fetching chat history for conversation_id: %s, limit: %s", conversation_id, limit)
         
         try:
+            # Let Postgres pick the most recent `limit` rows (newest first), then flip them
+            # into chronological order so callers never need to sort in Python
             query = supabase.table("messages") \
-                .select("*") \
-                .eq("conversation_id", str(conversation_uuid)) \
-                .order("created_at", desc=False) \
-                .limit(limit)
+                .select(MESSAGE_COLUMNS) \
+                .eq("conversation_id", str(conversation_uuid))
+            if cursor:
+                # A cursor instead of an offset: with the (conversation_id, created_at DESC, id DESC) index
+                # each page is an index seek, however far back it is
+                ts = cursor[0].isoformat()
+                if cursor[1]:
+                    query = query.or_(f"created_at.lt.{ts},and(created_at.eq.{ts},id.lt.{cursor[1]})")
+                else:
+                    query = query.lt("created_at", ts)
+            query = query.order("created_at", desc=True).order("id", desc=True).limit(limit)
             
-            logger.debug(f"Executing query: {query}")
+            logger.debug("Executing query: %s", query)
             response = query.execute()
             
             if response and hasattr(response, 'data'):
-                logger.info(f"Retrieved {len(response.data)} messages for conversation {conversation_id}")
-                return response.data
+                logger.info("Retrieved %d messages for conversation %s", len(response.data), conversation_id)
+                return _merge_unsaved_messages(conversation_id, response.data, limit, cursor)[::-1]
             else:
-                logger.warning(f"Query response does not contain data attribute: {response}")
+                logger.warning("Query response does not contain data attribute: %s", response)
                 return []
         except Exception as query_error:
-            logger.error(f"Error executing query: {query_error}")
-            return []
+            logger.error("Error executing query: %s", query_error)
+            return _merge_unsaved_messages(conversation_id, [], limit, cursor)[::-1]
             
     except Exception as e:
-        logger.error(f"Error getting chat history: {e}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Error getting chat history: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
         return [] # Return empty list on error
 
+def hash_admin_password(password: str) -> str:
+    """bcrypt hash of the password, as stored in admin_users.password_hash"""
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+
+_SHA256_HEX_RE = re.compile(r"^[0-9a-fA-F]{64}$")
+
+def _check_admin_password(password: str, password_hash: str) -> bool:
+    """Check a password against a stored bcrypt hash, a legacy salted SHA-256 digest or a legacy plaintext value"""
+    if password_hash.startswith("$2"):
+        return bcrypt.checkpw(password.encode(), password_hash.encode())
+    if _SHA256_HEX_RE.match(password_hash):
+        # Older rows hold hex SHA-256 of ADMIN_PASSWORD_SALT + password; compare in constant time.
+        # Never against the password itself, or the stored digest would work as a password.
+        _init()
+        legacy_digest = hashlib.sha256((os.getenv("ADMIN_PASSWORD_SALT", "") + password).encode()).hexdigest()
+        return hmac.compare_digest(password_hash.lower(), legacy_digest)
+    # Rows created before hashing hold the password itself; verify_admin_login upgrades them on success
+    return hmac.compare_digest(password_hash.encode(), password.encode())
+
+def _upgrade_admin_password_hash(username, password):
+    """Replace a legacy stored password with its bcrypt hash after a successful login"""
+    try:
+        supabase.table("admin_users").update({"password_hash": hash_admin_password(password)}).eq("username", username).execute()
+        logger.info("Upgraded stored admin password to bcrypt for user: %s", username)
+    except Exception as e:
+        # The login itself succeeded; the next one retries the upgrade
+        logger.warning("Could not upgrade admin password hash for user %s: %s", username, e)
+
+@functools.lru_cache(maxsize=1)
+def _dummy_admin_hash() -> bytes:
+    """bcrypt hash checked against when a username is unknown, built on first use"""
+    return bcrypt.hashpw(b"", bcrypt.gensalt())
+
+def _check_demo_admin(username, password) -> bool:
+    """Built-in demo credentials used when the database is unreachable; both parts are compared in constant time"""
+    username_ok = hmac.compare_digest(str(username).encode(), b"admin")
+    password_ok = hmac.compare_digest(str(password).encode(), b"admin123")
+    return username_ok and password_ok
+
 def verify_admin_login(username, password):
     """
     Verify admin login credentials against the database
     """
     try:
         if supabase:
-            response = supabase.table("admin_users").select("*").eq("username", username).limit(1).execute()
+            response = supabase.table("admin_users").select("password_hash").eq("username", username).limit(1).execute()
+            user = _first_row(response)
+            password_hash = user.get("password_hash") if user is not None else None
             
-            if response.data and len(response.data) > 0:
-                user = response.data[0]
-                # In a real application, use a proper password hashing library
-                if user["password_hash"] == password:
-                    logger.info(f"Admin login successful for user: {username}")
-                    return True
+            if password_hash and _check_admin_password(password, password_hash):
+                logger.info("Admin login successful for user: %s", username)
+                if not password_hash.startswith("$2"):
+                    _upgrade_admin_password_hash(username, password)
+                return True
+            if not password_hash:
+                # Spend the same bcrypt work as a real check, so response time doesn't reveal
+                # which usernames exist
+                bcrypt.checkpw(password.encode(), _dummy_admin_hash())
             
-            logger.info(f"Admin login failed for user: {username}")
+            logger.info("Admin login failed for user: %s", username)
             return False
         else:
             logger.warning("Supabase client not available, using default admin check")
             # Fallback for demo purposes - in production, always use the database
-            return username == "admin" and password == "admin123"
+            return _check_demo_admin(username, password)
     except Exception as e:
-        logger.error(f"Error verifying admin login: {e}")
+        logger.error("Error verifying admin login: %s", e)
         # Fallback for demo purposes
-        return username == "admin" and password == "admin123"
+        return _check_demo_admin(username, password)
 
 def is_admin_user(user_id=None, email=None):
     """
@@ -744,28 +1177,19 @@ def is_admin_user(user_id=None, email=None):
             logger.warning("No user_id or email provided for admin check")
             return False
             
-        query = supabase.table("admin_users").select("*")
-        
-        # Build query conditions
-        conditions = []
-        if user_id:
-            conditions.append(f"user_id.eq.{user_id}")
-        if email:
-            conditions.append(f"email.eq.{email}")
-            
-        if conditions:
-            query = query.or_(",".join(conditions))
-            
-        response = query.limit(1).execute()
+        # One .eq() query per identifier, so neither value is spliced into a PostgREST filter string
+        for column, value in (("user_id", user_id), ("email", email)):
+            if not value:
+                continue
+            response = supabase.table("admin_users").select("*").eq(column, value).limit(1).execute()
+            if _first_row(response) is not None:
+                logger.info("Found admin user for user_id=%s, email=%s", user_id, email)
+                return True
         
-        if response.data and len(response.data) > 0:
-            logger.info(f"Found admin user: {response.data[0]}")
-            return True
-            
-        logger.info(f"No admin user found for user_id={user_id}, email={email}")
+        logger.info("No admin user found for user_id=%s, email=%s", user_id, email)
         return False
     except Exception as e:
-        logger.error(f"Error checking admin user status: {e}")
+        logger.error("Error checking admin user status: %s", e)
         return False
 
 def check_schema_applied():
@@ -780,11 +1204,13 @@ def check_schema_applied():
         
         # Check if profiles table exists and has essential columns (e.g., bio)
         try:
-            response = supabase.table("profiles").select("id, bio").limit(1).execute()
-            logger.info(f"Profiles table exists, sample response: {response.data}")
+            # limit(0) still makes PostgREST resolve the table and columns (unknown ones are an error)
+            # but returns no rows, so the probe carries no row data
+            supabase.table("profiles").select("id, bio").limit(0).execute()
+            logger.debug("Profiles table exists with its essential columns")
             has_essential_cols = True
         except Exception as e:
-            logger.warning(f"Failed to query profiles table or essential columns don't exist: {e}")
+            logger.warning("Failed to query profiles table or essential columns don't exist: %s", e)
             has_essential_cols = False
             
         if has_essential_cols:
@@ -795,12 +1221,19 @@ def check_schema_applied():
             logger.warning("Please apply the schema by running the SQL in apply_schema.sql")
             return False
     except Exception as e:
-        logger.error(f"Error checking schema: {e}")
-        logger.error(f"Error trace: {traceback.format_exc()}")
+        logger.error("Error checking schema: %s", e)
+        logger.error("Error trace: %s", traceback.format_exc())
         return False
 
-# Call this function on startup to check schema status
-schema_ok = check_schema_applied()
+# Set by init_database() once the app starts
+schema_ok: Optional[bool] = None
+
+def init_database():
+    """Connect to Supabase and check the schema; called once per worker from the app's startup hook"""
+    global schema_ok
+    get_supabase()
+    schema_ok = check_schema_applied()
+    return schema_ok
 
 def get_all_profiles():
     """
@@ -808,15 +1241,15 @@ def get_all_profiles():
     """
     try:
         if not supabase:
-            print("Supabase client not initialized")
+            logger.error("Supabase client not initialized")
             return []
         
-        response = supabase.table("profiles").select("*").execute()
+        response = supabase.table("profiles").select(PROFILE_COLUMNS).execute()
         profiles = response.data
         
         return profiles
     except Exception as e:
-        print(f"Error getting all profiles: {e}")
+        logger.error("Error getting all profiles: %s", e)
         return []
 
 def get_all_documents():
@@ -825,7 +1258,7 @@ def get_all_documents():
     """
     try:
         if not supabase:
-            print("Supabase client not initialized")
+            logger.error("Supabase client not initialized")
             return []
         
         response = supabase.table("user_documents").select("*").execute()
@@ -833,32 +1266,34 @@ def get_all_documents():
         # If no documents found, try to create the test document
         if not response.data:
             logger.info("No documents found, adding test document")
-            create_test_document()
-            # Try fetching again
-            response = supabase.table("user_documents").select("*").execute()
+            # The insert already returns the new row, so there is no need to fetch again
+            test_document = create_test_document()
+            return [test_document] if test_document else []
             
         return response.data
     except Exception as e:
-        print(f"Error getting all documents: {e}")
+        logger.error("Error getting all documents: %s", e)
         return []
 
 def create_test_document():
     """
     Create a test document for the system - specifically the truck driver persona
+    Returns the stored document row, or None if it could not be created
     """
     try:
         if not supabase:
             logger.error("Supabase client not initialized")
-            return False
+            return None
             
         # Check if document already exists
         user_id = "9837e518-80f6-46d4-9aec-cf60c0d8be37"  # Ciril's user ID
         
         existing = supabase.table("user_documents").select("*").eq("user_id", user_id).eq("title", "Truck_Driver_Persona").execute()
         
-        if existing.data and len(existing.data) > 0:
-            logger.info(f"Test document already exists with ID: {existing.data[0]['id']}")
-            return True
+        existing_doc = _first_row(existing)
+        if existing_doc is not None:
+            logger.info("Test document already exists with ID: %s", existing_doc['id'])
+            return existing_doc
             
         # Create the document
         test_doc = {
@@ -910,15 +1345,15 @@ Quote:
         result = supabase.table("user_documents").insert(test_doc).execute()
         
         if result.data:
-            logger.info(f"Successfully created test document with ID: {result.data[0]['id']}")
-            return True
+            logger.info("Successfully created test document with ID: %s", result.data[0]['id'])
+            return result.data[0]
         else:
-            logger.error(f"Failed to create test document: {result.error}")
-            return False
+            logger.error("Failed to create test document: %s", result.error)
+            return None
             
     except Exception as e:
-        logger.error(f"Error creating test document: {e}")
-        return False
+        logger.error("Error creating test document: %s", e)
+        return None
 
 def get_visitor_id_from_session(session_id: str) -> Optional[str]:
     """Get visitor ID associated with a session ID"""
@@ -932,17 +1367,18 @@ def get_visitor_id_from_session(session_id: str) -> Optional[str]:
             return None
         
         # Query Supabase for the visitor ID
-        response = supabase.table("visitors").select("visitor_id").eq("session_id", session_id).execute()
+        response = supabase.table("visitors").select("visitor_id").eq("session_id", session_id).limit(1).execute()
+        visitor = _first_row(response)
         
-        if response.data and len(response.data) > 0:
-            visitor_id = response.data[0]["visitor_id"]
-            logger.info(f"Found visitor ID: {visitor_id} for session: {session_id}")
+        if visitor is not None:
+            visitor_id = visitor["visitor_id"]
+            logger.info("Found visitor ID: %s for session: %s", visitor_id, session_id)
             return visitor_id
         else:
-            logger.info(f"No visitor ID found for session: {session_id}")
+            logger.info("No visitor ID found for session: %s", session_id)
             return None
     except Exception as e:
-        logger.error(f"Error getting visitor ID from session: {e}")
+        logger.error("Error getting visitor ID from session: %s", e)
         logger.error(traceback.format_exc())
         return None 
 
@@ -960,36 +1396,36 @@ def get_notes(user_id: uuid.UUID) -> List[Dict]:
     try:
         # Prepare parameters for the RPC call
         params = {'p_user_id': str(user_id)}
-        logger.info(f"RPC CALL: Attempting to call get_notes_privileged with user_id: {user_id}")
+        logger.info("RPC CALL: Attempting to call get_notes_privileged with user_id: %s", user_id)
 
         # --- RPC Call ---
         try:
             response = supabase.rpc('get_notes_privileged', params).execute()
-            logger.info(f"RPC CALL RESPONSE (get_notes): {response}") # Log the full response
+            logger.debug("RPC CALL RESPONSE (get_notes): %s", response) # Log the full response
 
             if hasattr(response, 'data') and isinstance(response.data, list):
-                logger.info(f"RPC CALL SUCCESS (get_notes): Found {len(response.data)} notes for user {user_id}")
+                logger.info("RPC CALL SUCCESS (get_notes): Found %s notes for user %s", len(response.data), user_id)
                 return response.data # Return the list of notes
             else:
                 error_details = getattr(response, 'error', None)
                 status_code = getattr(response, 'status_code', 'N/A')
-                logger.error(f"RPC CALL FAILED (get_notes): Invalid data format or error. Status: {status_code}, Error: {error_details}")
+                logger.error("RPC CALL FAILED (get_notes): Invalid data format or error. Status: %s, Error: %s", status_code, error_details)
                 return [] # Return empty list on failure/invalid format
 
         except Exception as rpc_error:
-            logger.error(f"RPC CALL EXCEPTION (get_notes): An error occurred during RPC call.")
+            logger.error("RPC CALL EXCEPTION (get_notes): An error occurred during RPC call.")
             error_details = {
                  "message": getattr(rpc_error, 'message', str(rpc_error)),
                  "code": getattr(rpc_error, 'code', 'N/A'),
                  "details": getattr(rpc_error, 'details', None)
             }
-            logger.error(f"Supabase RPC Error Details: {error_details}")
-            logger.error(f"Full Traceback: {traceback.format_exc()}")
+            logger.error("Supabase RPC Error Details: %s", error_details)
+            logger.error("Full Traceback: %s", traceback.format_exc())
             return [] # Return empty list on exception
 
     except Exception as e:
-        logger.error(f"PRE-RPC EXCEPTION (get_notes): Error preparing for RPC call for user {user_id}: {e}")
-        logger.error(f"Full Traceback: {traceback.format_exc()}")
+        logger.error("PRE-RPC EXCEPTION (get_notes): Error preparing for RPC call for user %s: %s", user_id, e)
+        logger.error("Full Traceback: %s", traceback.format_exc())
         return []
 
 def create_note(user_id: uuid.UUID, content: str) -> Optional[Dict]:
@@ -1010,45 +1446,45 @@ def create_note(user_id: uuid.UUID, content: str) -> Optional[Dict]:
             'p_user_id': str(user_id),
             'p_content': content
         }
-        logger.info(f"RPC CALL: Attempting to call create_note_privileged with params: {params}")
+        logger.info("RPC CALL: Attempting to call create_note_privileged with params: %s", params)
 
         # --- RPC Call ---
         try:
             # Execute the PostgreSQL function
             response = supabase.rpc('create_note_privileged', params).execute()
-            logger.info(f"RPC CALL RESPONSE (create_note): {response}") # Log the full response
+            logger.debug("RPC CALL RESPONSE (create_note): %s", response) # Log the full response
 
             # Check response structure
-            if hasattr(response, 'data') and response.data and len(response.data) > 0:
-                created_note_data = response.data[0]
+            created_note_data = _first_row(response)
+            if created_note_data is not None:
                 # Basic check for expected fields based on function return type
                 if created_note_data.get('id') and created_note_data.get('user_id'):
-                    logger.info(f"RPC CALL SUCCESS (create_note): Created note with id: {created_note_data.get('id')}")
+                    logger.info("RPC CALL SUCCESS (create_note): Created note with id: %s", created_note_data.get('id'))
                     return created_note_data
                 else:
-                    logger.error(f"RPC CALL FAILED (create_note): Response data missing expected fields. Data: {created_note_data}")
+                    logger.error("RPC CALL FAILED (create_note): Response data missing expected fields. Data: %s", created_note_data)
                     return None
             else:
                 error_details = getattr(response, 'error', None)
                 status_code = getattr(response, 'status_code', 'N/A')
-                logger.error(f"RPC CALL FAILED (create_note): No data in response. Status: {status_code}, Error: {error_details}")
+                logger.error("RPC CALL FAILED (create_note): No data in response. Status: %s, Error: %s", status_code, error_details)
                 return None
 
         except Exception as rpc_error:
-            logger.error(f"RPC CALL EXCEPTION (create_note): An error occurred during RPC call.")
+            logger.error("RPC CALL EXCEPTION (create_note): An error occurred during RPC call.")
             error_details = {
                  "message": getattr(rpc_error, 'message', str(rpc_error)),
                  "code": getattr(rpc_error, 'code', 'N/A'),
                  "details": getattr(rpc_error, 'details', None)
             }
-            logger.error(f"Supabase RPC Error Details: {error_details}")
-            logger.error(f"Full Traceback: {traceback.format_exc()}")
+            logger.error("Supabase RPC Error Details: %s", error_details)
+            logger.error("Full Traceback: %s", traceback.format_exc())
             raise rpc_error # Re-raise for the router to handle
 
     except Exception as e:
         # Catch errors during parameter preparation or other logic
-        logger.error(f"PRE-RPC EXCEPTION (create_note): Error preparing for RPC call for user {user_id}: {e}")
-        logger.error(f"Full Traceback: {traceback.format_exc()}")
+        logger.error("PRE-RPC EXCEPTION (create_note): Error preparing for RPC call for user %s: %s", user_id, e)
+        logger.error("Full Traceback: %s", traceback.format_exc())
         return None
 
 def delete_note(note_id: uuid.UUID, user_id: uuid.UUID) -> bool:
@@ -1069,13 +1505,13 @@ def delete_note(note_id: uuid.UUID, user_id: uuid.UUID) -> bool:
             'p_note_id': str(note_id),
             'p_user_id': str(user_id)
         }
-        logger.info(f"RPC CALL: Attempting to call delete_note_privileged with params: {params}")
+        logger.info("RPC CALL: Attempting to call delete_note_privileged with params: %s", params)
         
         # --- RPC Call --- 
         try:
             # Execute the PostgreSQL function
             response = supabase.rpc('delete_note_privileged', params).execute()
-            logger.info(f"RPC CALL RESPONSE: {response}")
+            logger.debug("RPC CALL RESPONSE: %s", response)
 
             # The SQL function returns a boolean directly
             # For boolean returns, we need to access the raw response data
@@ -1084,22 +1520,22 @@ def delete_note(note_id: uuid.UUID, user_id: uuid.UUID) -> bool:
                 if isinstance(response.data, bool):
                     result = response.data
                     if result:
-                        logger.info(f"RPC CALL SUCCESS: Deleted note with id: {note_id}")
+                        logger.info("RPC CALL SUCCESS: Deleted note with id: %s", note_id)
                         return True
                     else:
-                        logger.warning(f"RPC CALL RESULT: No note found with id {note_id} for user {user_id}")
+                        logger.warning("RPC CALL RESULT: No note found with id %s for user %s", note_id, user_id)
                         return False
                 # Handle case where data is a list with a single boolean
                 elif isinstance(response.data, list) and len(response.data) > 0:
                     result = response.data[0]
                     if result:
-                        logger.info(f"RPC CALL SUCCESS: Deleted note with id: {note_id}")
+                        logger.info("RPC CALL SUCCESS: Deleted note with id: %s", note_id)
                         return True
                     else:
-                        logger.warning(f"RPC CALL RESULT: No note found with id {note_id} for user {user_id}")
+                        logger.warning("RPC CALL RESULT: No note found with id %s for user %s", note_id, user_id)
                         return False
                 else:
-                    logger.warning(f"RPC CALL RESULT: Unexpected data format: {response.data}")
+                    logger.warning("RPC CALL RESULT: Unexpected data format: %s", response.data)
                     # Try to extract success/failure from raw response JSON if possible
                     raw_json = getattr(response, '_response', None)
                     if raw_json and hasattr(raw_json, 'json'):
@@ -1108,27 +1544,27 @@ def delete_note(note_id: uuid.UUID, user_id: uuid.UUID) -> bool:
                             if isinstance(json_data, bool):
                                 return json_data
                         except Exception as json_error:
-                            logger.error(f"Failed to parse raw JSON response: {json_error}")
+                            logger.error("Failed to parse raw JSON response: %s", json_error)
                     
                     return False
             else:
                 error_details = getattr(response, 'error', None)
                 status_code = getattr(response, 'status_code', 'N/A')
-                logger.error(f"RPC CALL FAILED: Invalid response. Status: {status_code}, Error: {error_details}")
+                logger.error("RPC CALL FAILED: Invalid response. Status: %s, Error: %s", status_code, error_details)
                 return False
                 
         except Exception as rpc_error:
-            logger.error(f"RPC CALL EXCEPTION: An error occurred during RPC call: {str(rpc_error)}")
+            logger.error("RPC CALL EXCEPTION: An error occurred during RPC call: %s", str(rpc_error))
             # Try to extract result from raw response if it exists
             if hasattr(rpc_error, 'json') and callable(getattr(rpc_error, 'json')):
                 try:
                     error_json = rpc_error.json()
-                    logger.info(f"Error JSON content: {error_json}")
+                    logger.info("Error JSON content: %s", error_json)
                     # In some cases, the error might actually contain our result
                     if isinstance(error_json, bool):
                         return error_json
                 except Exception as json_error:
-                    logger.error(f"Failed to parse error JSON: {json_error}")
+                    logger.error("Failed to parse error JSON: %s", json_error)
             
             # If we got here, it's a true error
             error_details = {
@@ -1136,8 +1572,8 @@ def delete_note(note_id: uuid.UUID, user_id: uuid.UUID) -> bool:
                  "code": getattr(rpc_error, 'code', 'N/A'),
                  "details": getattr(rpc_error, 'details', None)
             }
-            logger.error(f"Supabase RPC Error Details: {error_details}")
-            logger.error(f"Full Traceback: {traceback.format_exc()}")
+            logger.error("Supabase RPC Error Details: %s", error_details)
+            logger.error("Full Traceback: %s", traceback.format_exc())
             
             # Special case for this particular error - it means the function executed but the library
             # couldn't handle the boolean return. We assume success in this case.
@@ -1149,8 +1585,8 @@ def delete_note(note_id: uuid.UUID, user_id: uuid.UUID) -> bool:
             
     except Exception as e:
         # Catch errors during parameter preparation or other logic
-        logger.error(f"PRE-RPC EXCEPTION: Error preparing for RPC call: {e}")
-        logger.error(f"Full Traceback: {traceback.format_exc()}")
+        logger.error("PRE-RPC EXCEPTION: Error preparing for RPC call: %s", e)
+        logger.error("Full Traceback: %s", traceback.format_exc())
         return False
 
 # --- End Notes Functions --- 
\ No newline at end of file
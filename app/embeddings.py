@@ -29,17 +29,17 @@ try:
     os.makedirs(CHROMA_DB_PATH, exist_ok=True)
 except OSError as e:
     if e.errno == 30:  # Read-only file system
-        print(f"Warning: Could not create directory {CHROMA_DB_PATH} - read-only filesystem. This is expected in some environments.")
+        logger.warning("Could not create directory %s - read-only filesystem. This is expected in some environments.", CHROMA_DB_PATH)
     else:
         raise e
 
 # Use persistent storage rather than in-memory
 try:
     chroma_client = chromadb.PersistentClient(path=CHROMA_DB_PATH)
-    print(f"ChromaDB client initialized with persistent storage at: {CHROMA_DB_PATH}")
+    logger.info("ChromaDB client initialized with persistent storage at: %s", CHROMA_DB_PATH)
 except Exception as e:
-    print(f"Warning: Failed to initialize ChromaDB with persistent storage: {e}")
-    print("Falling back to in-memory storage")
+    logger.warning("Failed to initialize ChromaDB with persistent storage: %s", e)
+    logger.info("Falling back to in-memory storage")
     chroma_client = chromadb.Client()
 
 # Initialize combined_instructions variable
@@ -68,7 +68,7 @@ class OpenAIEmbeddingFunction:
             embeddings = [item.embedding for item in response.data]
             return embeddings
         except Exception as e:
-            print(f"Error generating embeddings: {str(e)}")
+            logger.error("Error generating embeddings: %s", str(e))
             # Return a simple embedding with zeros to avoid crashing
             # This is a fallback for when the OpenAI API fails
             return [[0.0] * 1536] * len(input)  # 1536 is the dimension for ada-002 embeddings
@@ -82,6 +82,9 @@ portfolio_collection = chroma_client.get_or_create_collection(
     embedding_function=openai_ef
 )
 
+# Profile fields indexed for search, one vector DB document each (id "<field>_<user_id>")
+PROFILE_VECTOR_FIELDS = ("name", "location", "bio", "skills", "experience", "interests")
+
 def add_profile_to_vector_db(profile_data, user_id=None):
     """
     Add profile data to the vector database
@@ -90,7 +93,7 @@ def add_profile_to_vector_db(profile_data, user_id=None):
     try:
         # For simplicity, we'll use a single collection for all profiles
         collection_name = "portfolio_data"
-        print(f"Using collection name: {collection_name}")
+        logger.debug("Using collection name: %s", collection_name)
         
         # Create or get the appropriate collection
         collection = chroma_client.get_or_create_collection(
@@ -102,76 +105,43 @@ def add_profile_to_vector_db(profile_data, user_id=None):
         effective_user_id = user_id or profile_data.get("user_id")
         
         if not effective_user_id:
-            print("Warning: No user_id provided for vector DB entry. Profile data will not be user-specific.")
+            logger.warning("No user_id provided for vector DB entry. Profile data will not be user-specific.")
             effective_user_id = "default"
         else:
-            print(f"Adding profile data to vector DB for user_id: {effective_user_id}")
-        
-        # Clear existing profile documents for this specific user
-        try:
-            collection.delete(where={
-                "$and": [
-                    {"category": {"$eq": "profile"}},
-                    {"user_id": {"$eq": effective_user_id}}
-                ]
-            })
-            print(f"Cleared existing profile documents for user {effective_user_id}")
-        except Exception as clear_error:
-            print(f"Error clearing collection (may be empty): {clear_error}")
-        
-        # Format and add new documents
-        documents = []
-        metadatas = []
-        ids = []
-        
-        # Add name
-        if profile_data.get("name"):
-            documents.append(profile_data["name"])
-            metadatas.append({"category": "profile", "subcategory": "name", "user_id": effective_user_id})
-            ids.append(f"name_{effective_user_id}")
-        
-        # Add location
-        if profile_data.get("location"):
-            documents.append(profile_data["location"])
-            metadatas.append({"category": "profile", "subcategory": "location", "user_id": effective_user_id})
-            ids.append(f"location_{effective_user_id}")
-        
-        # Add bio
-        if profile_data.get("bio"):
-            documents.append(profile_data["bio"])
-            metadatas.append({"category": "profile", "subcategory": "bio", "user_id": effective_user_id})
-            ids.append(f"bio_{effective_user_id}")
-        
-        # Add skills
-        if profile_data.get("skills"):
-            documents.append(profile_data["skills"])
-            metadatas.append({"category": "profile", "subcategory": "skills", "user_id": effective_user_id})
-            ids.append(f"skills_{effective_user_id}")
-        
-        # Add experience
-        if profile_data.get("experience"):
-            documents.append(profile_data["experience"])
-            metadatas.append({"category": "profile", "subcategory": "experience", "user_id": effective_user_id})
-            ids.append(f"experience_{effective_user_id}")
-        
-        # Add interests
-        if profile_data.get("interests"):
-            documents.append(profile_data["interests"])
-            metadatas.append({"category": "profile", "subcategory": "interests", "user_id": effective_user_id})
-            ids.append(f"interests_{effective_user_id}")
-        
-        # Add documents to collection
-        if documents:
-            collection.add(
-                documents=documents,
-                metadatas=metadatas,
-                ids=ids
+            logger.debug("Adding profile data to vector DB for user_id: %s", effective_user_id)
+        
+        # Each indexed profile field has a fixed id per user, so the stored copies can be fetched by id
+        # and compared: only fields whose text changed are re-embedded, in one upsert, and fields that
+        # were cleared are deleted by id. Saving a profile whose indexed text is unchanged costs no embedding calls.
+        wanted = {}
+        for field in PROFILE_VECTOR_FIELDS:
+            if profile_data.get(field):
+                wanted[f"{field}_{effective_user_id}"] = (
+                    profile_data[field],
+                    {"category": "profile", "subcategory": field, "user_id": effective_user_id},
+                )
+        
+        all_ids = [f"{field}_{effective_user_id}" for field in PROFILE_VECTOR_FIELDS]
+        stored = collection.get(ids=all_ids, include=["documents"])
+        stored_documents = dict(zip(stored["ids"], stored["documents"]))
+        
+        cleared_ids = [doc_id for doc_id in stored_documents if doc_id not in wanted]
+        if cleared_ids:
+            collection.delete(ids=cleared_ids)
+            logger.debug("Removed %s cleared profile fields for user %s", len(cleared_ids), effective_user_id)
+        
+        changed_ids = [doc_id for doc_id, (text, _) in wanted.items() if stored_documents.get(doc_id) != text]
+        if changed_ids:
+            collection.upsert(
+                documents=[wanted[doc_id][0] for doc_id in changed_ids],
+                metadatas=[wanted[doc_id][1] for doc_id in changed_ids],
+                ids=changed_ids
             )
-            print(f"Successfully added {len(documents)} profile documents to vector database for user {effective_user_id}")
+            logger.debug("Upserted %s changed profile fields to vector database for user %s", len(changed_ids), effective_user_id)
             
         return True
     except Exception as e:
-        print(f"Error adding profile to vector database: {e}")
+        logger.error("Error adding profile to vector database: %s", e)
         return False
 
 def add_conversation_to_vector_db(message, response, visitor_id, message_id=None, user_id=None):
@@ -182,7 +152,7 @@ def add_conversation_to_vector_db(message, response, visitor_id, message_id=None
     try:
         # Use the portfolio collection for simplicity, but with different category
         collection_name = "portfolio_data"
-        print(f"Adding conversation to collection: {collection_name}")
+        logger.debug("Adding conversation to collection: %s", collection_name)
         
         # Create or get the appropriate collection
         collection = chroma_client.get_or_create_collection(
@@ -208,7 +178,7 @@ def add_conversation_to_vector_db(message, response, visitor_id, message_id=None
         # Add user_id if provided
         if user_id:
             metadata["user_id"] = user_id
-            print(f"Including user_id {user_id} in conversation metadata")
+            logger.debug("Including user_id %s in conversation metadata", user_id)
         
         # Add to vector DB
         collection.add(
@@ -217,10 +187,10 @@ def add_conversation_to_vector_db(message, response, visitor_id, message_id=None
             ids=[f"conversation_{message_id}"]
         )
         
-        print(f"Successfully added conversation exchange to vector database")
+        logger.debug("Successfully added conversation exchange to vector database")
         return True
     except Exception as e:
-        print(f"Error adding conversation to vector database: {e}")
+        logger.error("Error adding conversation to vector database: %s", e)
         return False
 
 def add_document_to_vector_db(document_data, user_id):
@@ -231,7 +201,7 @@ def add_document_to_vector_db(document_data, user_id):
     try:
         # Use the same collection as profile and project data
         collection_name = "portfolio_data"
-        print(f"Adding document content to collection: {collection_name}")
+        logger.debug("Adding document content to collection: %s", collection_name)
         
         # Create or get the collection
         collection = chroma_client.get_or_create_collection(
@@ -241,18 +211,18 @@ def add_document_to_vector_db(document_data, user_id):
         
         document_id = document_data.get("id")
         if not document_id:
-            print("Warning: Document has no ID, generating a random one")
+            logger.warning("Document has no ID, generating a random one")
             document_id = str(uuid.uuid4())
             
         # Get the extracted text from the document
         extracted_text = document_data.get("extracted_text", "")
         if not extracted_text:
-            print("Warning: Document has no extracted text to add to vector DB")
+            logger.warning("Document has no extracted text to add to vector DB")
             return False
             
         title = document_data.get("title", "Untitled Document")
         
-        print(f"Adding document '{title}' to vector DB for user_id: {user_id}")
+        logger.debug("Adding document '%s' to vector DB for user_id: %s", title, user_id)
         
         # Format and add new documents
         documents = []
@@ -320,42 +290,42 @@ def add_document_to_vector_db(document_data, user_id):
         
         # Add documents to collection
         if documents:
-            print(f"Adding {len(documents)} documents to vector DB:")
+            logger.debug("Adding %s documents to vector DB:", len(documents))
             for i, doc_id in enumerate(ids):
-                print(f"  ID {i}: {doc_id}")
+                logger.debug("  ID %s: %s", i, doc_id)
                 
             collection.add(
                 documents=documents,
                 metadatas=metadatas,
                 ids=ids
             )
-            print(f"Successfully added {len(documents)} document chunks to vector database")
+            logger.debug("Successfully added %s document chunks to vector database", len(documents))
             
         return True
     except Exception as e:
-        print(f"Error adding document to vector database: {e}")
+        logger.error("Error adding document to vector database: %s", e)
         return False
 
 def embed_and_store_notes(user_id: uuid.UUID, notes: List[Dict]):
     """Embeds notes and stores them in the user's vector DB collection."""
-    logger.info(f"EMBEDDING TASK STARTED: Received request to embed notes for user_id: {user_id}") # Log start
+    logger.info("EMBEDDING TASK STARTED: Received request to embed notes for user_id: %s", user_id) # Log start
     if not user_id:
         logger.error("EMBEDDING ERROR: No user_id provided for embedding notes.")
         return
     if not notes:
-        logger.info(f"EMBEDDING INFO: No notes provided for user {user_id} to embed.")
+        logger.info("EMBEDDING INFO: No notes provided for user %s to embed.", user_id)
         return
 
     try:
         collection_name = "portfolio_data"
         # Ensure chroma_client is defined and accessible in this scope
-        logger.info(f"EMBEDDING INFO: Accessing ChromaDB collection '{collection_name}'")
+        logger.info("EMBEDDING INFO: Accessing ChromaDB collection '%s'", collection_name)
         collection = chroma_client.get_or_create_collection(
             name=collection_name,
             embedding_function=openai_ef # Ensure openai_ef is defined and accessible
         )
 
-        logger.info(f"EMBEDDING INFO: Processing {len(notes)} notes for user {user_id}...")
+        logger.info("EMBEDDING INFO: Processing %s notes for user %s...", len(notes), user_id)
 
         documents = []
         metadatas = []
@@ -366,7 +336,7 @@ def embed_and_store_notes(user_id: uuid.UUID, notes: List[Dict]):
             content = note.get('content')
             
             if not note_id or not content:
-                logger.warning(f"EMBEDDING WARNING: Skipping note due to missing ID or content: {note}")
+                logger.warning("EMBEDDING WARNING: Skipping note due to missing ID or content: %s", note)
                 continue
             
             # Extract created_at date if available
@@ -393,14 +363,14 @@ def embed_and_store_notes(user_id: uuid.UUID, notes: List[Dict]):
                 metadatas=metadatas,
                 ids=ids
             )
-            logger.info(f"EMBEDDING INFO: Successfully added/updated {len(documents)} notes in ChromaDB for user {user_id}.")
+            logger.info("EMBEDDING INFO: Successfully added/updated %s notes in ChromaDB for user %s.", len(documents), user_id)
             return True
         else:
-            logger.info(f"EMBEDDING INFO: No valid notes found to embed for user {user_id}.")
+            logger.info("EMBEDDING INFO: No valid notes found to embed for user %s.", user_id)
             return False
             
     except Exception as e:
-        logger.error(f"EMBEDDING ERROR: Failed to embed notes for user {user_id}. Error: {e}")
+        logger.error("EMBEDDING ERROR: Failed to embed notes for user %s. Error: %s", user_id, e)
         return False
 
 def remove_note_from_vector_db(user_id: uuid.UUID, note_id: uuid.UUID) -> bool:
@@ -415,7 +385,7 @@ def remove_note_from_vector_db(user_id: uuid.UUID, note_id: uuid.UUID) -> bool:
     try:
         # Generate the vector ID (same format used when adding notes)
         vector_id = f"note_{user_id}_{note_id}"
-        logger.info(f"Attempting to remove note with vector_id: {vector_id}")
+        logger.info("Attempting to remove note with vector_id: %s", vector_id)
         
         # Try removing by ID first
         try:
@@ -426,10 +396,10 @@ def remove_note_from_vector_db(user_id: uuid.UUID, note_id: uuid.UUID) -> bool:
             )
             
             collection.delete(ids=[vector_id])
-            logger.info(f"Successfully removed note {note_id} from vector DB by ID")
+            logger.info("Successfully removed note %s from vector DB by ID", note_id)
             return True
         except Exception as id_delete_error:
-            logger.warning(f"Failed to remove note by ID, trying query-based removal: {id_delete_error}")
+            logger.warning("Failed to remove note by ID, trying query-based removal: %s", id_delete_error)
             
         # If ID-based removal fails, try with a filter
         try:
@@ -450,14 +420,14 @@ def remove_note_from_vector_db(user_id: uuid.UUID, note_id: uuid.UUID) -> bool:
             
             # Use a query to find and delete the entry
             collection.delete(where=where_filter)
-            logger.info(f"Successfully removed note {note_id} from vector DB using filters")
+            logger.info("Successfully removed note %s from vector DB using filters", note_id)
             return True
         except Exception as filter_delete_error:
-            logger.error(f"Failed to remove note using filters: {filter_delete_error}")
+            logger.error("Failed to remove note using filters: %s", filter_delete_error)
             return False
             
     except Exception as e:
-        logger.error(f"Error removing note from vector DB: {e}")
+        logger.error("Error removing note from vector DB: %s", e)
         logger.error(traceback.format_exc())
         return False
 
@@ -477,14 +447,14 @@ def query_vector_db(query, n_results=8, user_id=None, visitor_id=None, include_c
         # Check if collection is empty
         collection_count = collection.count()
         if collection_count == 0:
-            logger.info(f"Vector database is empty (count: 0), returning empty results")
+            logger.info("Vector database is empty (count: 0), returning empty results")
             return {
                 "documents": [[]],
                 "metadatas": [[]],
                 "distances": [[]]
             }
 
-        logger.info(f"Collection has {collection_count} total documents")
+        logger.info("Collection has %s total documents", collection_count)
 
         combined_docs = []
         metadatas = []
@@ -504,17 +474,17 @@ def query_vector_db(query, n_results=8, user_id=None, visitor_id=None, include_c
                      metadatas.extend(doc_results['metadatas'][0])
                      distances.extend(doc_results['distances'][0])
                      ids.extend(doc_results['ids'][0]) # Track IDs to avoid duplicates
-                logger.info(f"Found {len(doc_results.get('ids', [[]])[0])} document results.")
+                logger.info("Found %s document results.", len(doc_results.get('ids', [[]])[0]))
             except Exception as e:
-                logger.error(f"Error querying documents: {e}")
+                logger.error("Error querying documents: %s", e)
 
         # Query Notes (ADD THIS BLOCK)
         if user_id:
             try:
                 note_filter = {"$and": [{"category": {"$eq": "note"}}, user_filter]}
-                logger.info(f"QUERYING NOTES with filter: {note_filter}") # Add log for filter
+                logger.debug("QUERYING NOTES with filter: %s", note_filter) # Add log for filter
                 note_results = collection.query(query_texts=[query], n_results=5, where=note_filter) # Example N
-                logger.info(f"RAW NOTE RESULTS from ChromaDB: {note_results}") # Add log for raw results
+                logger.debug("RAW NOTE RESULTS from ChromaDB: %s", note_results) # Add log for raw results
 
                 if note_results and note_results.get('ids') and note_results['ids'][0]:
                     # Avoid adding duplicates already found
@@ -524,12 +494,12 @@ def query_vector_db(query, n_results=8, user_id=None, visitor_id=None, include_c
                             metadatas.append(note_results['metadatas'][0][i])
                             distances.append(note_results['distances'][0][i])
                             ids.append(note_id)
-                    logger.info(f"Found {len(note_results.get('ids', [[]])[0])} note results.")
+                    logger.info("Found %s note results.", len(note_results.get('ids', [[]])[0]))
                 else:
-                     logger.info(f"No relevant notes found for query based on raw results structure.") # Adjusted log message
+                     logger.info("No relevant notes found for query based on raw results structure.") # Adjusted log message
 
             except Exception as e:
-                logger.error(f"Error querying notes: {e}")
+                logger.error("Error querying notes: %s", e)
 
         # Query Profile
         if user_id:
@@ -544,9 +514,9 @@ def query_vector_db(query, n_results=8, user_id=None, visitor_id=None, include_c
                              metadatas.append(profile_results['metadatas'][0][i])
                              distances.append(profile_results['distances'][0][i])
                              ids.append(profile_id)
-                    logger.info(f"Found {len(profile_results.get('ids', [[]])[0])} profile results.")
+                    logger.info("Found %s profile results.", len(profile_results.get('ids', [[]])[0]))
             except Exception as e:
-                logger.error(f"Error querying profile: {e}")
+                logger.error("Error querying profile: %s", e)
 
         # Query Conversations (handle visitor_id if needed)
         if include_conversation and visitor_id:
@@ -564,9 +534,9 @@ def query_vector_db(query, n_results=8, user_id=None, visitor_id=None, include_c
                             metadatas.append(conv_results['metadatas'][0][i])
                             distances.append(conv_results['distances'][0][i])
                             ids.append(conv_id)
-                    logger.info(f"Found {len(conv_results.get('ids', [[]])[0])} conversation results.")
+                    logger.info("Found %s conversation results.", len(conv_results.get('ids', [[]])[0]))
             except Exception as e:
-                logger.error(f"Error querying conversation: {e}")
+                logger.error("Error querying conversation: %s", e)
 
         # Combine, Sort, and Limit Results
         if not combined_docs:
@@ -581,7 +551,7 @@ def query_vector_db(query, n_results=8, user_id=None, visitor_id=None, include_c
         final_meta = [metadatas[i] for i in sorted_indices[:n_results]]
         final_dist = [distances[i] for i in sorted_indices[:n_results]]
 
-        logger.info(f"Returning top {len(final_docs)} combined results after sorting.")
+        logger.info("Returning top %s combined results after sorting.", len(final_docs))
         return {
             "documents": [final_docs],
             "metadatas": [final_meta],
@@ -589,8 +559,8 @@ def query_vector_db(query, n_results=8, user_id=None, visitor_id=None, include_c
         }
 
     except Exception as e:
-        logger.error(f"Error querying vector database: {e}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Error querying vector database: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
         return {"documents": [[]], "metadatas": [[]], "distances": [[]]} # Return empty
 
 def format_conversation_history(chat_history: List[dict]) -> str:
@@ -628,7 +598,7 @@ async def generate_ai_response(message: str, search_results: dict, profile_data:
             meta_list = search_results["metadatas"][0]
 
             if docs_list and meta_list and len(docs_list) == len(meta_list):
-                logger.info(f"Processing {len(docs_list)} search results for prompt")
+                logger.info("Processing %s search results for prompt", len(docs_list))
                 for i, doc in enumerate(docs_list):
                     metadata = meta_list[i]
                     category = metadata.get("category", "unknown")
@@ -662,11 +632,11 @@ async def generate_ai_response(message: str, search_results: dict, profile_data:
                     if category in context_sections:
                         context_sections[category].append(context_entry)
                     else:
-                        logger.warning(f"Unknown category '{category}' in search results, adding to profile section.")
+                        logger.warning("Unknown category '%s' in search results, adding to profile section.", category)
                         context_sections["profile"].append(context_entry)
 
                 for section, entries in context_sections.items():
-                    logger.info(f"Collected {len(entries)} entries for section: {section}")
+                    logger.info("Collected %s entries for section: %s", len(entries), section)
             else:
                 logger.info("Search results structure invalid or empty inner lists.")
         else:
@@ -679,7 +649,7 @@ async def generate_ai_response(message: str, search_results: dict, profile_data:
         for section, entries in context_sections.items():
             limit = max_entries.get(section, 3)
             if len(entries) > limit:
-                 logger.info(f"Limiting {section} entries from {len(entries)} to {limit}")
+                 logger.info("Limiting %s entries from %s to %s", section, len(entries), limit)
                  context_sections[section] = entries[:limit]
 
         # Build context_text for the prompt
@@ -722,7 +692,7 @@ async def generate_ai_response(message: str, search_results: dict, profile_data:
             style = chatbot_config.get('communicationStyle') # Use communicationStyle for key
             user_instructions = chatbot_config.get('instructions', '')  # Extract user instructions
 
-            logger.info(f"Applying chatbot config: Tone={tone}, Personality={personality}, Style={style}, Instructions provided: {bool(user_instructions)}")
+            logger.info("Applying chatbot config: Tone=%s, Personality=%s, Style=%s, Instructions provided: %s", tone, personality, style, bool(user_instructions))
 
             if tone:
                 tone_instructions = f"Adopt a {tone} tone."
@@ -789,8 +759,8 @@ async def generate_ai_response(message: str, search_results: dict, profile_data:
         if combined_instructions:
             system_prompt += f"\n{combined_instructions}"
 
-        logger.info(f"System prompt length: {len(system_prompt)} characters")
-        logger.debug(f"System prompt start: {system_prompt[:500]}...")
+        logger.info("System prompt length: %s characters", len(system_prompt))
+        logger.debug("System prompt start: %s...", system_prompt[:500])
 
         messages = [
             {"role": "system", "content": system_prompt},
@@ -805,25 +775,25 @@ async def generate_ai_response(message: str, search_results: dict, profile_data:
                 max_tokens=500
             )
             ai_response = response.choices[0].message.content.strip()
-            logger.info(f"Generated AI response (length: {len(ai_response)})")
+            logger.info("Generated AI response (length: %s)", len(ai_response))
             return ai_response
         except openai.APIError as e:
-            logger.error(f"OpenAI API Error: {str(e)}")
+            logger.error("OpenAI API Error: %s", str(e))
             return f"I apologize, I encountered an API issue processing your request. Error details: {str(e)}"
         except openai.APIConnectionError as e:
-            logger.error(f"OpenAI API Connection Error: {str(e)}")
+            logger.error("OpenAI API Connection Error: %s", str(e))
             return f"I apologize, I couldn't connect to the AI service. Please check the connection. Error details: {str(e)}"
         except openai.RateLimitError as e:
-            logger.error(f"OpenAI Rate Limit Error: {str(e)}")
+            logger.error("OpenAI Rate Limit Error: %s", str(e))
             return f"I apologize, the AI service is currently overloaded. Please try again later. Error details: {str(e)}"
         except Exception as openai_error:
-            logger.error(f"OpenAI API call failed: {openai_error}")
-            logger.error(f"Traceback: {traceback.format_exc()}")
+            logger.error("OpenAI API call failed: %s", openai_error)
+            logger.error("Traceback: %s", traceback.format_exc())
             return f"I apologize, but I'm having trouble processing your request as {name}'s AI clone. Please try again later."
 
     except Exception as e:
-        logger.error(f"Error in generate_ai_response outer block: {e}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        logger.error("Error in generate_ai_response outer block: %s", e)
+        logger.error("Traceback: %s", traceback.format_exc())
         return "I'm sorry, I encountered an unexpected internal error while generating a response."
 
 def add_truck_driver_document_to_vector_db():
@@ -833,7 +803,7 @@ def add_truck_driver_document_to_vector_db():
     try:
         user_id = "9837e518-80f6-46d4-9aec-cf60c0d8be37"  # Ciril's user ID
         collection_name = "portfolio_data"
-        print(f"Adding truck driver document directly to collection: {collection_name}")
+        logger.debug("Adding truck driver document directly to collection: %s", collection_name)
         
         # Create or get the collection
         collection = chroma_client.get_or_create_collection(
@@ -914,11 +884,11 @@ Quote:
             ids=ids
         )
         
-        print(f"Successfully added truck driver document to vector database with 2 chunks")
+        logger.debug("Successfully added truck driver document to vector database with 2 chunks")
         return True
         
     except Exception as e:
-        print(f"Error adding truck driver document to vector database: {e}")
+        logger.error("Error adding truck driver document to vector database: %s", e)
         return False 
 
 def get_related_documents(query, user_id=None, n_results=5):
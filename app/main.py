@@ -1,13 +1,14 @@
+import asyncio
 from fastapi import FastAPI, Request, Depends, HTTPException, File, UploadFile, Form, Body, BackgroundTasks, Query, status
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List, Union
 import logging
 import os
-import json
+import orjson
 import uuid
 from app import models
-from app.database import get_profile_data, update_profile_data, log_chat_message, get_chat_history, get_or_create_chatbot, get_or_create_conversation, get_or_create_visitor
+from app.database import get_profile_data, update_profile_data, log_chat_message, get_chat_history, get_or_create_chatbot, get_or_create_conversation, get_or_create_visitor, init_database
 from app.embeddings import add_profile_to_vector_db, query_vector_db, generate_ai_response, add_conversation_to_vector_db
 from app.routes import chatbot, profiles, admin, documents, chatbot as chatbot_routes
 from app.routes import notes
@@ -22,6 +23,7 @@ from starlette.responses import Response, FileResponse, JSONResponse
 import re
 import jwt
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import ORJSONResponse
 
 # EMERGENCY FIX - Import the emergency endpoint
 try:
@@ -49,6 +51,8 @@ logging.basicConfig(
         logging.StreamHandler()
     ]
 )
+# LOG_LEVEL=WARNING in production drops the per-request info/debug chatter before it is formatted
+logging.getLogger().setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
 logger = logging.getLogger(__name__)
 
 # Configure OpenAI
@@ -64,17 +68,44 @@ try:
         openai.models.list()
         logger.info("Successfully initialized OpenAI client")
     except Exception as api_error:
-        logger.warning(f"OpenAI API list models test failed: {str(api_error)}")
+        logger.warning("OpenAI API list models test failed: %s", str(api_error))
         logger.warning("Continuing with application startup despite API test failure")
 except Exception as e:
-    logger.error(f"Error initializing OpenAI client: {str(e)}")
+    logger.error("Error initializing OpenAI client: %s", str(e))
     if "invalid_api_key" in str(e).lower():
         logger.error("Invalid API key format detected. Please check your OpenAI API key format.")
     # Log the error but don't crash the application
     logger.warning("Continuing application startup despite OpenAI client initialization issue")
 
-# Create the FastAPI app
-app = FastAPI()
+# Create the FastAPI app; responses are encoded with orjson rather than the stdlib json module
+app = FastAPI(default_response_class=ORJSONResponse)
+
+@app.on_event("startup")
+def startup_init_database():
+    """Connect to Supabase once per worker at startup rather than when app.database is imported"""
+    init_database()
+
+# Public paths that don't require authentication
+PUBLIC_PATHS = [
+    r"^/$",                      # Root path
+    r"^/docs",                   # Swagger documentation
+    r"^/redoc",                  # ReDoc
+    r"^/openapi.json",           # OpenAPI schema
+    r"^/profile",                # TEMP: Make profile endpoint public for testing
+    r"^/chat/public",            # Public chat endpoints
+    r"^/chat/[^/]+/public$",     # Public chatbot endpoint for specific user (GET and POST)
+    r"^/chat/[^/]+/public/history", # Public chat history endpoint
+    r"^/profile/public",         # Public profile endpoints
+    r"^/emergency-chat",         # Emergency chat endpoint
+    r"^/check-chat",             # Chat status check
+    r"^/chat$",                  # Main chat endpoint
+    r"^/chat/history",           # Chat history endpoint
+    r"^/chatbots/public/[^/]+$", # Public chatbot access by slug
+]
+# Compiled once into a single alternation so each request does one regex match, not one per path
+PUBLIC_PATHS_RE = re.compile("|".join(f"(?:{pattern})" for pattern in PUBLIC_PATHS))
+# Body of every 401 from AuthMiddleware, serialised once
+NOT_AUTHENTICATED_BODY = orjson.dumps({"detail": "Not authenticated"})
 
 # Authentication middleware
 class AuthMiddleware(BaseHTTPMiddleware):
@@ -82,37 +113,17 @@ class AuthMiddleware(BaseHTTPMiddleware):
         # Allow OPTIONS requests to pass through for CORS preflight
         if request.method == "OPTIONS":
             return await call_next(request)
-            
-        # Public paths that don't require authentication
-        public_paths = [
-            r"^/$",                      # Root path
-            r"^/docs",                   # Swagger documentation
-            r"^/redoc",                  # ReDoc
-            r"^/openapi.json",           # OpenAPI schema
-            r"^/profile",                # TEMP: Make profile endpoint public for testing
-            r"^/chat/public",            # Public chat endpoints
-            r"^/chat/[^/]+/public$",     # Public chatbot endpoint for specific user (GET and POST)
-            r"^/chat/[^/]+/public/history", # Public chat history endpoint
-            r"^/profile/public",         # Public profile endpoints
-            r"^/emergency-chat",         # Emergency chat endpoint
-            r"^/check-chat",             # Chat status check
-            r"^/chat$",                  # Main chat endpoint
-            r"^/chat/history",           # Chat history endpoint
-            r"^/chatbots/public/[^/]+$", # Public chatbot access by slug
-        ]
         
         # Check if the current path is in the public paths
-        path = request.url.path
-        for pattern in public_paths:
-            if re.match(pattern, path):
-                return await call_next(request)
+        if PUBLIC_PATHS_RE.match(request.url.path):
+            return await call_next(request)
         
         # If path requires authentication, check for Authorization header
         auth_header = request.headers.get("Authorization")
         if not auth_header or not auth_header.startswith("Bearer "):
             return Response(
                 status_code=401,
-                content=json.dumps({"detail": "Not authenticated"}),
+                content=NOT_AUTHENTICATED_BODY,
                 media_type="application/json"
             )
         
@@ -209,16 +220,16 @@ async def profile(user_id: Optional[str] = None, request: Request = None):
                     payload = jwt.decode(token, options={"verify_signature": False})
                     jwt_user_id = payload.get("sub")
                     if jwt_user_id:
-                        logging.info(f"Extracted user_id from JWT: {jwt_user_id}")
+                        logging.info("Extracted user_id from JWT: %s", jwt_user_id)
                         effective_user_id = jwt_user_id
                 except Exception as jwt_error:
-                    logging.warning(f"Error decoding JWT: {jwt_error}")
+                    logging.warning("Error decoding JWT: %s", jwt_error)
         
-        logging.info(f"Getting profile data for user_id: {effective_user_id}")
+        logging.info("Getting profile data for user_id: %s", effective_user_id)
         profile_data = get_profile_data(user_id=effective_user_id)
         return profile_data
     except Exception as e:
-        logging.error(f"Error getting profile data: {e}")
+        logging.error("Error getting profile data: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # Update profile data (POST endpoint) - kept for backward compatibility
@@ -249,33 +260,33 @@ async def update_profile_handler(profile_data: ProfileData, user_id: Optional[st
                     payload = jwt.decode(token, options={"verify_signature": False})
                     jwt_user_id = payload.get("sub")
                     if jwt_user_id:
-                        logging.info(f"Extracted user_id from JWT: {jwt_user_id}")
+                        logging.info("Extracted user_id from JWT: %s", jwt_user_id)
                         effective_user_id = jwt_user_id
                 except Exception as jwt_error:
-                    logging.warning(f"Error decoding JWT: {jwt_error}")
+                    logging.warning("Error decoding JWT: %s", jwt_error)
         
-        logging.info(f"Updating profile data for user_id: {effective_user_id}")
+        logging.info("Updating profile data for user_id: %s", effective_user_id)
         
         # Convert Pydantic model to dict
         profile_dict = profile_data.dict(exclude_unset=True)
         
         # Log data for debugging
-        logging.info(f"Profile data received: {profile_dict}")
-        logging.info(f"User ID from query param: {user_id}")
-        logging.info(f"User ID from profile data: {profile_dict.get('user_id')}")
+        logging.debug("Profile data received: %s", profile_dict)
+        logging.info("User ID from query param: %s", user_id)
+        logging.info("User ID from profile data: %s", profile_dict.get('user_id'))
         
         # Ensure profile_photo_url from the model is correctly placed in the dict,
         # overriding any potential issue from the .dict() call for this specific field.
         if hasattr(profile_data, 'profile_photo_url'):
             profile_dict['profile_photo_url'] = profile_data.profile_photo_url
-            logging.info(f"Manually setting profile_photo_url in dict to: {profile_dict['profile_photo_url']}")
+            logging.info("Manually setting profile_photo_url in dict to: %s", profile_dict['profile_photo_url'])
         
         # Check for user_id in profile_data, fall back to extracted JWT user_id or query param if not provided
         profile_user_id = profile_dict.get('user_id')
         final_user_id = profile_user_id or effective_user_id
         
         if final_user_id:
-            logging.info(f"Using final user_id: {final_user_id}")
+            logging.info("Using final user_id: %s", final_user_id)
             # Ensure the user_id is also in the profile data
             profile_dict['user_id'] = final_user_id
         
@@ -291,7 +302,7 @@ async def update_profile_handler(profile_data: ProfileData, user_id: Optional[st
         
         return {"message": "Profile updated successfully", "profile": updated_profile}
     except Exception as e:
-        logging.error(f"Error updating profile data: {e}")
+        logging.error("Error updating profile data: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 # Helper function to check if meeting request is valid based on rules
@@ -338,14 +349,15 @@ async def chat(chat_request: models.ChatRequest):
         target_user_id = chat_request.target_user_id # Used to find default chatbot if chatbot_id is missing
         visitor_name = chat_request.visitor_name # For visitor creation/update
         
+        chatbot_data = None
         if not chatbot_id and target_user_id:
-            logger.info(f"No chatbot_id provided, looking up default for target_user_id: {target_user_id}")
+            logger.info("No chatbot_id provided, looking up default for target_user_id: %s", target_user_id)
             chatbot_data = get_or_create_chatbot(user_id=target_user_id)
             if chatbot_data:
                 chatbot_id = chatbot_data.get("id")
-                logger.info(f"Using default chatbot_id: {chatbot_id}")
+                logger.info("Using default chatbot_id: %s", chatbot_id)
             else:
-                logger.error(f"Could not find or create a default chatbot for user {target_user_id}")
+                logger.error("Could not find or create a default chatbot for user %s", target_user_id)
                 raise HTTPException(status_code=404, detail="Chatbot configuration not found.")
         
         if not chatbot_id:
@@ -355,33 +367,43 @@ async def chat(chat_request: models.ChatRequest):
         if not visitor_id:
             # Generate a visitor ID if one is not provided (or handle error)
             visitor_id = str(uuid.uuid4())
-            logger.warning(f"No visitor_id provided, generated a new one: {visitor_id}")
+            logger.warning("No visitor_id provided, generated a new one: %s", visitor_id)
             # Optionally, you might want to raise an error if visitor_id is strictly required
             # raise HTTPException(status_code=400, detail="Visitor ID is required.")
 
         # Ensure visitor exists in the visitors table (using the separate function)
-        try:
-            visitor_record = get_or_create_visitor(visitor_id, visitor_name)
-            # Use the UUID from the visitor record for consistency, if available
-            db_visitor_id = visitor_record.get("id") if visitor_record else visitor_id
-            if not db_visitor_id:
-                logger.error(f"Failed to get or create visitor, using original ID: {visitor_id}")
-                db_visitor_id = visitor_id # Fallback, though this might cause issues if it's not a UUID
-            else:
-                logger.info(f"Ensured visitor exists with UUID: {db_visitor_id}")
-        except Exception as visitor_err:
-            logger.error(f"Error ensuring visitor exists: {visitor_err}")
-            # Decide how to proceed: raise error or continue with potentially non-UUID visitor_id?
-            # For now, let's try continuing, get_or_create_conversation might raise an error if format is wrong
-            db_visitor_id = visitor_id 
+        def ensure_visitor():
+            try:
+                visitor_record = get_or_create_visitor(visitor_id, visitor_name)
+                # Use the UUID from the visitor record for consistency, if available
+                db_visitor_id = visitor_record.get("id") if visitor_record else visitor_id
+                if not db_visitor_id:
+                    logger.error("Failed to get or create visitor, using original ID: %s", visitor_id)
+                    return visitor_id # Fallback, though this might cause issues if it's not a UUID
+                logger.info("Ensured visitor exists with UUID: %s", db_visitor_id)
+                return db_visitor_id
+            except Exception as visitor_err:
+                logger.error("Error ensuring visitor exists: %s", visitor_err)
+                # Decide how to proceed: raise error or continue with potentially non-UUID visitor_id?
+                # For now, let's try continuing, get_or_create_conversation might raise an error if format is wrong
+                return visitor_id
+
+        # The visitor upsert and the chatbot row (for the owner ID) are independent, so fetch them side by side.
+        # The chatbot is only fetched here if the default-chatbot lookup above didn't already return it.
+        if chatbot_data:
+            db_visitor_id = await asyncio.to_thread(ensure_visitor)
+        else:
+            db_visitor_id, chatbot_data = await asyncio.gather(
+                asyncio.to_thread(ensure_visitor),
+                asyncio.to_thread(get_or_create_chatbot, chatbot_id=chatbot_id),
+            )
+        owner_user_id = chatbot_data.get("user_id") if chatbot_data else None
 
         # Get or create the conversation ID
-        conversation_id = get_or_create_conversation(chatbot_id=str(chatbot_id), visitor_id=str(db_visitor_id))
-        logger.info(f"Using conversation_id: {conversation_id}")
+        conversation_id = get_or_create_conversation(chatbot_id=str(chatbot_id), visitor_id=str(db_visitor_id), owner_user_id=owner_user_id)
+        logger.info("Using conversation_id: %s", conversation_id)
 
         # --- Meeting Request Logic (remains largely the same, but uses chatbot owner ID) ---
-        chatbot_data = get_or_create_chatbot(chatbot_id=chatbot_id) # Fetch chatbot data again to get owner ID safely
-        owner_user_id = chatbot_data.get("user_id")
         
         if any(keyword in user_message_lower for keyword in ["meet", "meeting", "schedule", "appointment", "chat", "discuss", "call"]):
             profile_data = get_profile_data(user_id=owner_user_id)
@@ -393,47 +415,42 @@ async def chat(chat_request: models.ChatRequest):
                         f"{calendly_link}\n\nPlease select a time that works best for you."
                     )
                     # Log this interaction as well
-                    log_chat_message(conversation_id=conversation_id, message=user_message, response=meeting_response, sender="user")
+                    await asyncio.to_thread(log_chat_message, conversation_id=conversation_id, message=user_message, response=meeting_response, sender="user")
                     return models.ChatResponse(response=meeting_response)
                 else:
                     meeting_response = ("I understand you'd like to schedule a meeting. However, based on our meeting policy, "
                                       "I can only schedule meetings for specific purposes. Could you please clarify the purpose "
                                       "of the meeting?")
-                    log_chat_message(conversation_id=conversation_id, message=user_message, response=meeting_response, sender="user")
+                    await asyncio.to_thread(log_chat_message, conversation_id=conversation_id, message=user_message, response=meeting_response, sender="user")
                     return models.ChatResponse(response=meeting_response)
         # --- End Meeting Request Logic ---
 
-        logging.info(f"Processing normal chat message for conversation {conversation_id}")
+        logging.info("Processing normal chat message for conversation %s", conversation_id)
 
         if not user_message or user_message.strip() == "":
             logging.warning("No valid user message found in request")
             return models.ChatResponse(response="I didn't receive a valid message. Please try again.")
         
-        # Get profile data for the chatbot owner
-        profile_data = get_profile_data(user_id=owner_user_id)
-        logging.info(f"Retrieved profile data for owner {owner_user_id}: {profile_data.get('id', 'No ID')}") 
-        
-        # Query vector database (remains similar, but context might change)
-        logging.info(f"Querying vector DB for relevant context for conversation {conversation_id}")
-        search_results = query_vector_db(
-            query=user_message, 
-            n_results=3,
-            user_id=owner_user_id, # Filter context by chatbot owner
-            # visitor_id=db_visitor_id, # Optional: Could filter context by visitor too
-            # include_conversation=True # This might need adjustment based on how history is stored in vector DB
-        )
-        
-        # Get sequential conversation history using the new function
-        logging.info(f"Getting sequential conversation history for conversation: {conversation_id}")
+        # Profile data for the chatbot owner, vector DB context and sequential conversation history
+        # don't depend on each other, so fetch them concurrently in worker threads
+        logging.info("Querying profile, vector DB and history for conversation %s", conversation_id)
         history_limit = 10 
-        chat_history = get_chat_history(
-            conversation_id=conversation_id,
-            limit=history_limit
+        profile_data, search_results, chat_history = await asyncio.gather(
+            asyncio.to_thread(get_profile_data, user_id=owner_user_id),
+            asyncio.to_thread(
+                query_vector_db,
+                query=user_message, 
+                n_results=3,
+                user_id=owner_user_id, # Filter context by chatbot owner
+                # visitor_id=db_visitor_id, # Optional: Could filter context by visitor too
+                # include_conversation=True # This might need adjustment based on how history is stored in vector DB
+            ),
+            asyncio.to_thread(get_chat_history, conversation_id=conversation_id, limit=history_limit),
         )
+        logging.info("Retrieved profile data for owner %s: %s", owner_user_id, profile_data.get('id', 'No ID')) 
         
-        # Sort history (already sorted by DB query, but maybe double-check)
-        # chat_history = sorted(chat_history, key=lambda x: x.get("created_at"), reverse=False)
-        logging.info(f"Found {len(chat_history)} previous messages in conversation history")
+        # History comes back oldest first from get_chat_history, no need to sort here
+        logging.info("Found %s previous messages in conversation history", len(chat_history))
         
         # Generate AI response
         ai_response = generate_ai_response(
@@ -443,12 +460,13 @@ async def chat(chat_request: models.ChatRequest):
             chat_history=chat_history
         )
         
-        logging.info(f"Generated AI response: {ai_response[:50]}...")
+        logging.info("Generated AI response: %s...", ai_response[:50])
         
         # Log chat interaction using the new function
-        logging.info(f"Saving chat message to conversation {conversation_id}...")
+        logging.info("Saving chat message to conversation %s...", conversation_id)
         try:
-            log_chat_message(
+            await asyncio.to_thread(
+                log_chat_message,
                 conversation_id=conversation_id,
                 message=user_message,
                 sender="user", 
@@ -457,7 +475,7 @@ async def chat(chat_request: models.ChatRequest):
             logging.info("Chat message saved successfully.")
         except Exception as log_err:
             # Log error but continue to return response to user
-            logger.error(f"Failed to log chat message: {log_err}") 
+            logger.error("Failed to log chat message: %s", log_err) 
             logger.error(traceback.format_exc())
         
         # TODO: Update vector DB storage if needed
@@ -469,7 +487,7 @@ async def chat(chat_request: models.ChatRequest):
         return models.ChatResponse(response=ai_response)
         
     except Exception as e:
-        logger.error(f"Error processing chat: {e}")
+        logger.error("Error processing chat: %s", e)
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
@@ -482,7 +500,7 @@ async def chat(chat_request: models.ChatRequest):
 async def history(chatbot_id: str, visitor_id: str, limit: int = 50):
     """Get chat history for a specific chatbot and visitor."""
     try:
-        logger.info(f"Getting chat history for chatbot: {chatbot_id}, visitor: {visitor_id}, limit: {limit}")
+        logger.info("Getting chat history for chatbot: %s, visitor: %s, limit: %s", chatbot_id, visitor_id, limit)
         
         # Ensure visitor exists and get their UUID
         try:
@@ -490,21 +508,21 @@ async def history(chatbot_id: str, visitor_id: str, limit: int = 50):
             db_visitor_id = visitor_record.get("id") if visitor_record else visitor_id
             if not db_visitor_id:
                 raise ValueError("Could not find visitor record")
-            logger.info(f"Using visitor UUID: {db_visitor_id}")
+            logger.info("Using visitor UUID: %s", db_visitor_id)
         except Exception as visitor_err:
-            logger.error(f"Failed to get visitor UUID for history: {visitor_err}")
+            logger.error("Failed to get visitor UUID for history: %s", visitor_err)
             raise HTTPException(status_code=404, detail="Visitor not found")
 
         # Find the conversation ID
         try:
             # Use get_or_create, but we expect it to exist if history is requested
             conversation_id = get_or_create_conversation(chatbot_id=chatbot_id, visitor_id=str(db_visitor_id))
-            logger.info(f"Found conversation_id: {conversation_id}")
+            logger.info("Found conversation_id: %s", conversation_id)
         except ValueError as ve:
-            logger.error(f"Value error finding conversation: {ve}")
+            logger.error("Value error finding conversation: %s", ve)
             raise HTTPException(status_code=404, detail=f"Conversation not found: {ve}")
         except Exception as e:
-            logger.error(f"Error finding conversation for history: {e}")
+            logger.error("Error finding conversation for history: %s", e)
             raise HTTPException(status_code=500, detail="Error retrieving conversation")
 
         # Get chat history using the conversation ID
@@ -513,7 +531,7 @@ async def history(chatbot_id: str, visitor_id: str, limit: int = 50):
             limit=limit
         )
         
-        logging.info(f"Retrieved {len(history_messages)} chat history entries for conversation {conversation_id}")
+        logging.info("Retrieved %s chat history entries for conversation %s", len(history_messages), conversation_id)
         
         # Return history in the expected format (check if models.ChatHistoryResponse exists or adjust)
         # Assuming a simple list return for now
@@ -522,7 +540,7 @@ async def history(chatbot_id: str, visitor_id: str, limit: int = 50):
     except HTTPException as he:
         raise he # Re-raise HTTP exceptions
     except Exception as e:
-        logger.error(f"Error getting chat history: {e}")
+        logger.error("Error getting chat history: %s", e)
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Internal Server Error retrieving history: {str(e)}")
 
@@ -542,11 +560,15 @@ async def public_chat(user_id: str, chat_request: ChatRequest):
         visitor_id = chat_request.visitor_id
         visitor_name = chat_request.visitor_name
         
-        logger.info(f"Public chat request for user ID: {user_id}, visitor ID: {visitor_id}")
-        logger.info(f"Message content: {message[:50]}..." if len(message) > 50 else f"Message content: {message}")
+        logger.info("Public chat request for user ID: %s, visitor ID: %s", user_id, visitor_id)
+        logger.debug("Message content: %.50s%s", message, "..." if len(message) > 50 else "")
         
-        # Get the chatbot for this user - this will get or create a chatbot
-        chatbot = get_or_create_chatbot(user_id=user_id)
+        # Get the chatbot for this user (this will get or create a chatbot) and the visitor record.
+        # Neither lookup depends on the other, so they run concurrently in worker threads.
+        chatbot, visitor_record = await asyncio.gather(
+            asyncio.to_thread(get_or_create_chatbot, user_id=user_id),
+            asyncio.to_thread(get_or_create_visitor, visitor_id, visitor_name),
+        )
         
         if not chatbot:
             raise HTTPException(
@@ -563,10 +585,8 @@ async def public_chat(user_id: str, chat_request: ChatRequest):
             
         # Get the actual chatbot ID to use
         chatbot_id = chatbot.get("id")
-        logger.info(f"Using chatbot with ID: {chatbot_id} for public chat")
+        logger.info("Using chatbot with ID: %s for public chat", chatbot_id)
         
-        # Get or create the visitor record
-        visitor_record = get_or_create_visitor(visitor_id_text=visitor_id, name=visitor_name)
         if not visitor_record:
             raise HTTPException(
                 status_code=500,
@@ -581,27 +601,21 @@ async def public_chat(user_id: str, chat_request: ChatRequest):
             )
             
         # Get or create the conversation
-        conversation_id = get_or_create_conversation(
+        conversation_id = await asyncio.to_thread(
+            get_or_create_conversation,
             chatbot_id=str(chatbot_id),
-            visitor_id=str(db_visitor_id)
+            visitor_id=str(db_visitor_id),
+            owner_user_id=chatbot.get("user_id")
         )
         
-        logger.info(f"Using conversation ID: {conversation_id} for chat")
+        logger.info("Using conversation ID: %s for chat", conversation_id)
         
-        # Get profile data for the chatbot owner
-        profile_data = get_profile_data(user_id=user_id)
-        
-        # Query vector database for relevant context
-        search_results = query_vector_db(
-            query=message, 
-            n_results=3,
-            user_id=user_id
-        )
-        
-        # Get sequential conversation history
-        chat_history = get_chat_history(
-            conversation_id=conversation_id,
-            limit=10
+        # Profile data for the chatbot owner, vector DB context and sequential conversation history,
+        # fetched concurrently since none of them depends on the others
+        profile_data, search_results, chat_history = await asyncio.gather(
+            asyncio.to_thread(get_profile_data, user_id=user_id),
+            asyncio.to_thread(query_vector_db, query=message, n_results=3, user_id=user_id),
+            asyncio.to_thread(get_chat_history, conversation_id=conversation_id, limit=10),
         )
         
         # Generate AI response
@@ -613,7 +627,8 @@ async def public_chat(user_id: str, chat_request: ChatRequest):
         )
         
         # Log the message and response to the database with the conversation ID
-        log_chat_message(
+        await asyncio.to_thread(
+            log_chat_message,
             conversation_id=conversation_id,
             message=message,
             sender="user",
@@ -628,7 +643,7 @@ async def public_chat(user_id: str, chat_request: ChatRequest):
     except HTTPException as he:
         raise he
     except Exception as e:
-        logger.error(f"Error in public chat endpoint: {e}")
+        logger.error("Error in public chat endpoint: %s", e)
         import traceback
         logger.error(traceback.format_exc())
         raise HTTPException(
@@ -645,7 +660,7 @@ async def get_public_chatbot_history(user_id: str, visitor_id: Optional[str] = N
     """
     try:
         # Log the request details
-        logger.info(f"Getting public chat history for user_id: {user_id}, visitor_id: {visitor_id}")
+        logger.info("Getting public chat history for user_id: %s, visitor_id: %s", user_id, visitor_id)
         
         # First, get the chatbot for this user (don't create if it doesn't exist)
         chatbot = get_or_create_chatbot(user_id=user_id)
@@ -664,7 +679,7 @@ async def get_public_chatbot_history(user_id: str, visitor_id: Optional[str] = N
             
         # Now we have the actual chatbot ID to use
         chatbot_id = chatbot.get("id")
-        logger.info(f"Found chatbot with ID: {chatbot_id} for user: {user_id}")
+        logger.info("Found chatbot with ID: %s for user: %s", chatbot_id, user_id)
         
         # Verify visitor ID exists, create if needed
         if not visitor_id:
@@ -674,20 +689,20 @@ async def get_public_chatbot_history(user_id: str, visitor_id: Optional[str] = N
         try:
             # Find or create the visitor in our database
             db_visitor_id = get_or_create_visitor(visitor_id_text=visitor_id)
-            logger.info(f"Found or created visitor with DB ID: {db_visitor_id}")
+            logger.info("Found or created visitor with DB ID: %s", db_visitor_id)
         except Exception as ve:
-            logger.error(f"Error finding/creating visitor: {ve}")
+            logger.error("Error finding/creating visitor: %s", ve)
             raise HTTPException(status_code=500, detail=f"Visitor error: {str(ve)}")
 
         # Find the conversation ID using chatbot_id and the visitor's DB UUID
         try:
             conversation_id = get_or_create_conversation(chatbot_id=str(chatbot_id), visitor_id=str(db_visitor_id))
-            logger.info(f"Found conversation_id: {conversation_id} for public history")
+            logger.info("Found conversation_id: %s for public history", conversation_id)
         except ValueError as ve:
-            logger.error(f"Value error finding public conversation: {ve}")
+            logger.error("Value error finding public conversation: %s", ve)
             raise HTTPException(status_code=404, detail=f"Conversation not found: {ve}")
         except Exception as e:
-            logger.error(f"Error finding public conversation for history: {e}")
+            logger.error("Error finding public conversation for history: %s", e)
             raise HTTPException(status_code=500, detail="Error retrieving conversation")
 
         # Get chat history using the conversation ID
@@ -696,7 +711,7 @@ async def get_public_chatbot_history(user_id: str, visitor_id: Optional[str] = N
             limit=limit
         )
         
-        logging.info(f"Retrieved {len(history_messages)} public chat history entries for conversation {conversation_id}")
+        logging.info("Retrieved %s public chat history entries for conversation %s", len(history_messages), conversation_id)
         
         # Return history as a simple list (matching the main /chat/history endpoint)
         return history_messages
@@ -704,7 +719,7 @@ async def get_public_chatbot_history(user_id: str, visitor_id: Optional[str] = N
     except HTTPException as he:
         raise he # Re-raise HTTP exceptions
     except Exception as e:
-        logging.error(f"Error getting public chat history: {e}")
+        logging.error("Error getting public chat history: %s", e)
         logger.error(traceback.format_exc())
         raise HTTPException(
             status_code=500,
@@ -1,7 +1,10 @@
 from fastapi import APIRouter, HTTPException, Depends, Header, Query
 from typing import Optional, List, Dict
+import base64
+import json
 import os
-from supabase import create_client, Client
+import threading
+import time
 from dotenv import load_dotenv
 import logging
 import uuid
@@ -17,6 +20,50 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+# token -> (Supabase Auth user, expires_at as Unix time). Only successful checks are cached, for at most
+# ADMIN_TOKEN_CACHE_SECONDS and never past the token's own exp, so a revoked session stops working within
+# seconds and an expired one immediately.
+ADMIN_TOKEN_CACHE_SECONDS = 10
+ADMIN_TOKEN_CACHE_MAX_SIZE = 1024
+_token_user_cache: Dict[str, tuple] = {}
+_token_user_cache_lock = threading.Lock()
+
+def _token_expiry(token: str) -> Optional[float]:
+    """exp claim of a JWT, read without verifying it (Supabase Auth does that), or None if unreadable"""
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return float(claims["exp"])
+    except Exception:
+        return None
+
+def _get_token_user(token: str):
+    """Supabase Auth user for token, or None if the token is invalid or expired"""
+    now = time.time()
+    with _token_user_cache_lock:
+        cached = _token_user_cache.get(token)
+    if cached and now < cached[1]:
+        return cached[0]
+
+    expires_at = _token_expiry(token)
+    if expires_at is not None and expires_at <= now:
+        return None
+
+    user = supabase.auth.get_user(token).user
+    if user:
+        cache_until = now + ADMIN_TOKEN_CACHE_SECONDS
+        if expires_at is not None:
+            cache_until = min(cache_until, expires_at)
+        with _token_user_cache_lock:
+            if len(_token_user_cache) >= ADMIN_TOKEN_CACHE_MAX_SIZE:
+                expired = [key for key, (_, until) in _token_user_cache.items() if until <= now]
+                for key in expired:
+                    del _token_user_cache[key]
+                if len(_token_user_cache) >= ADMIN_TOKEN_CACHE_MAX_SIZE:
+                    _token_user_cache.clear()
+            _token_user_cache[token] = (user, cache_until)
+    return user
+
 async def verify_admin_token(authorization: Optional[str] = Header(None)):
     """
     Verify that a user's token is valid by checking against Supabase Auth
@@ -36,9 +83,8 @@ async def verify_admin_token(authorization: Optional[str] = Header(None)):
         if not supabase:
             raise HTTPException(status_code=500, detail="Supabase client is not initialized")
             
-        # Verify token with Supabase
-        result = supabase.auth.get_user(token)
-        user = result.user
+        # Verify token with Supabase (cached briefly, since every admin request carries the same token)
+        user = _get_token_user(token)
         
         if not user:
             raise HTTPException(status_code=401, detail="Invalid or expired token")
@@ -48,7 +94,7 @@ async def verify_admin_token(authorization: Optional[str] = Header(None)):
         # Return the user for potential further use
         return user
     except Exception as e:
-        print(f"Error verifying token: {e}")
+        logger.error("Error verifying token: %s", e)
         raise HTTPException(status_code=401, detail="Authentication failed")
 
 @router.get("/me", response_model=models.AdminInfoResponse)
@@ -63,7 +109,7 @@ async def get_admin_info(user = Depends(verify_admin_token)):
             success=True
         )
     except Exception as e:
-        print(f"Error in get_admin_info: {e}")
+        logger.error("Error in get_admin_info: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to get user info: {str(e)}"
@@ -109,7 +155,7 @@ async def create_admin(admin_data: models.AdminCreateRequest):
         )
             
     except Exception as e:
-        print(f"Error creating user: {e}")
+        logger.error("Error creating user: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to create user: {str(e)}"
@@ -131,144 +177,62 @@ async def get_admin_chat_history(
             raise HTTPException(status_code=500, detail="Supabase client not initialized")
         
         user_id = target_user_id or user.id
-        logger.info(f"Fetching admin chat history for user: {user_id}, page: {page}, page_size: {page_size}")
-
-        # Step 1: Fetch all conversations for this user
-        conversations_response = supabase.table("conversations") \
-            .select("id, visitor_id") \
-            .eq("user_id", user_id) \
-            .order("created_at", desc=False) \
-            .limit(1000) \
-            .execute()
-        
-        if not conversations_response.data:
-            logger.info(f"No conversations found for user {user_id}")
-            return models.ChatHistoryResponse(history=[], count=0)
+        logger.info("Fetching admin chat history for user: %s, page: %s, page_size: %s", user_id, page, page_size)
 
-        # Extract conversation IDs and visitor IDs in one pass
-        conversation_ids = [conv["id"] for conv in conversations_response.data if conv.get("id")]
-        conversation_to_visitor = {
-            conv["id"]: conv["visitor_id"] 
-            for conv in conversations_response.data 
-            if conv.get("id") and conv.get("visitor_id")
-        }
-        visitor_ids = list(set(filter(None, [conv.get("visitor_id") for conv in conversations_response.data])))
-
-        if not conversation_ids:
-             logger.warning(f"No valid conversation IDs found for user {user_id}")
-             return models.ChatHistoryResponse(history=[], count=0)
-             
-        if not visitor_ids:
-            logger.warning(f"No valid visitor IDs found in conversations for user {user_id}")
-            # Proceed, but visitor names might be missing
-
-        # Step 2: Fetch visitor names in a single query
-        visitor_name_map = {}
-        if visitor_ids:
-            try:
-                visitors_response = supabase.table("visitors") \
-                    .select("id, name") \
-                    .in_("id", visitor_ids) \
-                    .execute()
-                
-                if visitors_response.data:
-                    visitor_name_map = {vis["id"]: vis.get("name") for vis in visitors_response.data}
-                    logger.info(f"Fetched names for {len(visitor_name_map)} visitors")
-                else:
-                     logger.warning(f"Could not fetch names for visitor IDs: {visitor_ids}")
-            except Exception as e:
-                logger.error(f"Error fetching visitor names: {e}")
-
-
-        # Step 3: Fetch messages for all conversations in a single query with pagination
+        # Fetch one page of messages together with their conversation owner and visitor name.
+        # The inner join on conversations lets Postgres filter by owner directly, so there is
+        # no need to collect conversation IDs first, and count="exact" returns the total in
+        # the same response instead of a separate count query.
         offset = (page - 1) * page_size
         
         try:
             messages_response = supabase.table("messages") \
-                .select("*") \
-                .in_("conversation_id", conversation_ids) \
+                .select("id, message, sender, response, created_at, conversation_id, conversations!inner(user_id, visitor_id, visitors(name))", count="exact") \
+                .eq("conversations.user_id", user_id) \
                 .order("created_at", desc=True) \
                 .range(offset, offset + page_size - 1) \
                 .execute()
             
-            if messages_response.data is None:
-                 logger.warning(f"Messages query returned None data for conversations {conversation_ids}")
-                 raw_messages = []
-            else:
-                 raw_messages = messages_response.data
+            raw_messages = messages_response.data or []
+            total_count = messages_response.count if messages_response.count is not None else len(raw_messages)
         except Exception as e:
-            logger.error(f"Error fetching messages: {e}")
+            logger.error("Error fetching messages: %s", e)
             raw_messages = []
-        
-        # Step 4: Get total message count for pagination
-        total_count = 0
-        if conversation_ids:
-            try:
-                count_response = supabase.table("messages") \
-                    .select("id", count="exact") \
-                    .in_("conversation_id", conversation_ids) \
-                    .execute()
-                total_count = count_response.count if hasattr(count_response, "count") and count_response.count is not None else 0
-            except Exception as count_error:
-                logger.warning(f"Could not get exact message count for user {user_id}: {count_error}. Using length of fetched page.")
-                total_count = len(raw_messages) # Fallback, might be inaccurate
+            total_count = 0
 
-        # Step 5: Format messages into ChatHistoryItem including visitor details
+        # Format messages into ChatHistoryItem including visitor details
         formatted_history = []
         for msg in raw_messages:
-            conversation_id = msg.get("conversation_id")
-            visitor_id = conversation_to_visitor.get(conversation_id)
-            visitor_name = visitor_name_map.get(visitor_id) if visitor_id else None
+            conversation = msg.get("conversations") or {}
+            visitor = conversation.get("visitors") or {}
+            visitor_id = conversation.get("visitor_id")
             
             formatted_history.append(
                 models.ChatHistoryItem(
-                    id=msg.get("id", str(uuid.uuid4())), # Use message ID or generate one
+                    id=msg.get("id") or str(uuid.uuid4()), # Use message ID; only generate one (an urandom read) when it is missing
                     message=msg.get("message", ""),
                     sender=msg.get("sender", "unknown"),
                     response=msg.get("response"),
                     timestamp=msg.get("created_at", ""),
                     visitor_id=visitor_id or "unknown", # Provide visitor_id
-                    visitor_name=visitor_name, # Add visitor name
-                    conversation_id=conversation_id # Add conversation_id
+                    visitor_name=visitor.get("name"), # Add visitor name
+                    conversation_id=msg.get("conversation_id") # Add conversation_id
                 )
             )
 
-        logger.info(f"Returning {len(formatted_history)} messages for page {page}, total count: {total_count}")
+        logger.info("Returning %s messages for page %s, total count: %s", len(formatted_history), page, total_count)
         return models.ChatHistoryResponse(
             history=formatted_history,
             count=total_count
         )
 
     except Exception as e:
-        logger.exception(f"Error fetching admin chat history: {e}") # Log the full traceback
+        logger.exception("Error fetching admin chat history: %s", e) # Log the full traceback
         raise HTTPException(
             status_code=500,
             detail=f"Failed to get chat history: {str(e)}"
         ) 
 
-# Add this helper function near the top or before the delete endpoint
-async def verify_conversation_owner(conversation_id: uuid.UUID, user_id: uuid.UUID):
-    """Verifies that the given user_id owns the specified conversation_id."""
-    if not supabase:
-        raise HTTPException(status_code=500, detail="Database client not available")
-    try:
-        response = supabase.table("conversations") \
-            .select("user_id") \
-            .eq("id", str(conversation_id)) \
-            .maybe_single() \
-            .execute()
-
-        if response.data and response.data.get("user_id") == str(user_id):
-            return True
-        else:
-            # Log attempted access or just return False
-            logger.warning(f"User {user_id} attempted to access conversation {conversation_id} owned by another user or non-existent conversation.")
-            return False
-    except Exception as e:
-        logger.error(f"Error verifying conversation owner for conv {conversation_id}, user {user_id}: {e}")
-        raise HTTPException(status_code=500, detail="Error verifying conversation ownership")
-
-
 @router.delete("/chat/conversations/{conversation_id}", status_code=204)
 async def delete_admin_conversation(
     conversation_id: str,
@@ -278,54 +242,38 @@ async def delete_admin_conversation(
     Deletes a specific conversation and all its associated messages.
     Ensures the conversation belongs to the authenticated user.
     """
-    logger.info(f"Attempting to delete conversation {conversation_id} for user {user.id}")
+    logger.info("Attempting to delete conversation %s for user %s", conversation_id, user.id)
     if not supabase:
         raise HTTPException(status_code=500, detail="Supabase client not initialized")
 
     try:
         conv_uuid = uuid.UUID(conversation_id)
     except ValueError:
-        logger.error(f"Invalid UUID format for conversation_id: {conversation_id}")
+        logger.error("Invalid UUID format for conversation_id: %s", conversation_id)
         raise HTTPException(status_code=400, detail="Invalid conversation ID format.")
 
-    # Verify the user owns the conversation
-    is_owner = await verify_conversation_owner(conv_uuid, user.id)
-    if not is_owner:
-        logger.warning(f"User {user.id} does not own conversation {conversation_id} or it doesn't exist.")
-        raise HTTPException(status_code=403, detail="Forbidden: You do not own this conversation.")
-
     try:
-        # Step 1: Delete associated messages
-        logger.info(f"Deleting messages for conversation {conversation_id}")
-        delete_messages_response = supabase.table("messages") \
-            .delete() \
-            .eq("conversation_id", str(conv_uuid)) \
-            .execute()
-        # Log the data part of the response (should be empty on success)
-        logger.info(f"Messages delete response data: {delete_messages_response.data}")
-
-        # Step 2: Delete the conversation itself
-        logger.info(f"Deleting conversation record {conversation_id}")
+        # Ownership is enforced by the user_id filter on the delete itself, and messages go with the
+        # conversation through the ON DELETE CASCADE on messages.conversation_id, so one round trip does it
+        logger.info("Deleting conversation record %s", conversation_id)
         delete_conv_response = supabase.table("conversations") \
             .delete() \
             .eq("id", str(conv_uuid)) \
             .eq("user_id", str(user.id)) \
             .execute()
-
-        # Log the data part of the response (should be empty on success)
-        logger.info(f"Conversation delete response data: {delete_conv_response.data}")
-
-        # If execute() did not raise an exception, assume success or record already gone.
-        # Remove the check based on status_code or data presence for delete operations.
-        # if delete_conv_response.status_code not in [200, 204] or (hasattr(delete_conv_response, 'data') and not delete_conv_response.data):
-        #      logger.warning(f"Conversation {conversation_id} could not be deleted or was already gone.")
-             
-        logger.info(f"Successfully deleted conversation {conversation_id} and its messages.")
-        # No content is returned on successful deletion (status code 204)
+        logger.debug("Conversation delete response data: %s", delete_conv_response.data)
 
     except Exception as e:
-        logger.error(f"Error during deletion of conversation {conversation_id}: {e}")
+        logger.error("Error during deletion of conversation %s: %s", conversation_id, e)
         # Log the traceback for detailed debugging
         import traceback
         logger.error(traceback.format_exc())
-        raise HTTPException(status_code=500, detail=f"Failed to delete conversation: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to delete conversation: {str(e)}")
+
+    # No row back means the conversation doesn't exist or belongs to someone else
+    if not delete_conv_response.data:
+        logger.warning("User %s does not own conversation %s or it doesn't exist.", user.id, conversation_id)
+        raise HTTPException(status_code=403, detail="Forbidden: You do not own this conversation.")
+
+    logger.info("Successfully deleted conversation %s and its messages.", conversation_id)
+    # No content is returned on successful deletion (status code 204)
@@ -1,3 +1,4 @@
+import asyncio
 import time
 import logging
 import traceback
@@ -10,7 +11,7 @@ from app import models
 from app.database import (
     log_chat_message, get_chat_history, get_profile_data, 
     get_or_create_chatbot, supabase, get_or_create_conversation, get_or_create_visitor,
-    get_user_chatbots, update_chatbot_config
+    get_user_chatbots, update_chatbot_config, parse_history_cursor
 )
 from app.embeddings import query_vector_db, generate_ai_response, add_conversation_to_vector_db
 from app.auth import get_current_user, User
@@ -39,9 +40,9 @@ async def chat(request: models.ChatRequest):
         visitor_name = request.visitor_name
         chatbot_id = request.chatbot_id
         
-        logger.info(f"Chat request received from visitor {visitor_id} (name: {visitor_name or 'unknown'})")
-        logger.info(f"Message: {message[:100]}..." if len(message) > 100 else f"Message: {message}")
-        logger.info(f"Chatbot ID requested: {chatbot_id or 'None'}")
+        logger.info("Chat request received from visitor %s (name: %s)", visitor_id, visitor_name or 'unknown')
+        logger.debug("Message: %.100s%s", message, "..." if len(message) > 100 else "")
+        logger.info("Chatbot ID requested: %s", chatbot_id or 'None')
         
         # Basic input validation
         if not message or message.strip() == "":
@@ -62,70 +63,67 @@ async def chat(request: models.ChatRequest):
             raise HTTPException(status_code=404, detail=f"Chatbot not found: {chatbot_id}")
         owner_user_id = chatbot.get("user_id")
         chatbot_config = chatbot.get("configuration", {})
-        logger.info(f"Using provided chatbot_id {chatbot_id} owned by user {owner_user_id}")
+        logger.info("Using provided chatbot_id %s owned by user %s", chatbot_id, owner_user_id)
         
         if not owner_user_id:
-             logger.error(f"Could not determine owner_user_id for chatbot {chatbot_id}")
+             logger.error("Could not determine owner_user_id for chatbot %s", chatbot_id)
              raise HTTPException(status_code=500, detail="Could not identify chatbot owner.")
 
         # --- Ensure Visitor and Conversation --- 
         if not visitor_id:
             visitor_id = str(uuid.uuid4())
-            logger.warning(f"No visitor_id provided, generated a new one: {visitor_id}")
+            logger.warning("No visitor_id provided, generated a new one: %s", visitor_id)
 
         try:
             visitor_record = get_or_create_visitor(visitor_id, visitor_name)
             db_visitor_id = visitor_record.get('id') if visitor_record else visitor_id
             if not db_visitor_id:
-                 logger.error(f"Failed to get or create visitor, using original ID: {visitor_id}")
+                 logger.error("Failed to get or create visitor, using original ID: %s", visitor_id)
                  db_visitor_id = visitor_id 
             else:
-                 logger.info(f"Ensured visitor exists with UUID: {db_visitor_id}")
+                 logger.info("Ensured visitor exists with UUID: %s", db_visitor_id)
                  # Use the db_visitor_id (UUID) going forward
                  visitor_id = str(db_visitor_id) 
         except Exception as visitor_err:
-            logger.error(f"Error ensuring visitor exists: {visitor_err}")
+            logger.error("Error ensuring visitor exists: %s", visitor_err)
             raise HTTPException(status_code=500, detail=f"Failed to process visitor information: {visitor_err}")
 
         try:
-             conversation_id = get_or_create_conversation(chatbot_id=str(chatbot_id), visitor_id=visitor_id) # Use UUID visitor_id
-             logger.info(f"Using conversation_id: {conversation_id}")
+             conversation_id = get_or_create_conversation(chatbot_id=str(chatbot_id), visitor_id=visitor_id, owner_user_id=owner_user_id) # Use UUID visitor_id
+             logger.info("Using conversation_id: %s", conversation_id)
         except Exception as conv_err:
-             logger.error(f"Error getting/creating conversation: {conv_err}")
+             logger.error("Error getting/creating conversation: %s", conv_err)
              raise HTTPException(status_code=500, detail=f"Failed to establish conversation: {conv_err}")
 
-        # --- Profile Data --- 
-        profile_data = get_profile_data(user_id=owner_user_id)
+        # --- Profile Data, Vector DB Search and Chat History --- 
+        # The three lookups are independent, so run the blocking calls concurrently in worker
+        # threads instead of one after another on the event loop
+        logger.info("Loading profile, vector DB context and history for conversation %s", conversation_id)
+        history_limit = 10
+        profile_data, search_results, chat_history = await asyncio.gather(
+            asyncio.to_thread(get_profile_data, user_id=owner_user_id),
+            asyncio.to_thread(
+                query_vector_db,
+                query=message, 
+                n_results=3,
+                user_id=owner_user_id,
+                # visitor_id=visitor_id, # Maybe filter by visitor?
+                # include_conversation=True # Needs review based on vector storage changes
+            ),
+            asyncio.to_thread(get_chat_history, conversation_id=conversation_id, limit=history_limit),
+        )
+
         if profile_data:
             profile_id = profile_data.get('id', 'None')
-            logger.info(f"Loaded profile data for chatbot owner (user_id={owner_user_id}): profile_id={profile_id}")
+            logger.info("Loaded profile data for chatbot owner (user_id=%s): profile_id=%s", owner_user_id, profile_id)
         else:
-            logger.warning(f"No profile data found for chatbot owner (user_id={owner_user_id}) - using empty profile")
+            logger.warning("No profile data found for chatbot owner (user_id=%s) - using empty profile", owner_user_id)
             profile_data = {}
         
-        # --- Vector DB Search --- 
-        logger.info(f"Querying vector DB for relevant context for conversation {conversation_id}")
-        search_results = query_vector_db(
-            query=message, 
-            n_results=3,
-            user_id=owner_user_id,
-            # visitor_id=visitor_id, # Maybe filter by visitor?
-            # include_conversation=True # Needs review based on vector storage changes
-        )
-        
-        # --- Database Chat History --- 
-        logger.info(f"Fetching sequential conversation history for conversation {conversation_id}")
-        history_limit = 10
-        chat_history = get_chat_history(
-            conversation_id=conversation_id,
-            limit=history_limit 
-            # REMOVED: visitor_id, chatbot_id
-        )
-        
-        logger.info(f"Found {len(chat_history)} previous messages in conversation history")
+        logger.info("Found %s previous messages in conversation history", len(chat_history))
         
         # --- Generate AI Response --- 
-        logger.info(f"Generating AI response with conversation context")
+        logger.info("Generating AI response with conversation context")
         ai_response = await generate_ai_response(
             message=message,
             search_results=search_results,
@@ -139,9 +137,10 @@ async def chat(request: models.ChatRequest):
             ai_response = "I apologize, but I couldn't formulate a proper response. Could we try a different question?"
         
         # --- Log Message --- 
-        logger.info(f"Logging chat message to conversation {conversation_id}")
+        logger.info("Logging chat message to conversation %s", conversation_id)
         try:
-            log_result = log_chat_message(
+            log_result = await asyncio.to_thread(
+                log_chat_message,
                 conversation_id=conversation_id,
                 message=message, 
                 sender="user", 
@@ -151,7 +150,7 @@ async def chat(request: models.ChatRequest):
             )
             logger.info("Message logged successfully.")
         except Exception as log_err:
-             logger.error(f"Failed to log chat message (continuing): {log_err}")
+             logger.error("Failed to log chat message (continuing): %s", log_err)
              logger.error(traceback.format_exc())
 
         # --- Update Vector DB (TODO) --- 
@@ -162,7 +161,7 @@ async def chat(request: models.ChatRequest):
         # --- Calculate Time and Return --- 
         end_time = time.time()
         query_time_ms = (end_time - start_time) * 1000
-        logger.info(f"Request completed in {query_time_ms:.0f}ms")
+        logger.info("Request completed in %.0fms", query_time_ms)
         
         return models.ChatResponse(
             response=ai_response,
@@ -171,7 +170,7 @@ async def chat(request: models.ChatRequest):
     
     # --- Error Handling Fallback --- 
     except Exception as e:
-        logger.error(f"Error in chat route: {str(e)}")
+        logger.error("Error in chat route: %s", str(e))
         logger.error(traceback.format_exc())
         # Log the error, but still try to return a reasonable response
         try:
@@ -181,9 +180,9 @@ async def chat(request: models.ChatRequest):
             try:
                 if owner_user_id: # Check if owner_user_id was determined before error
                     profile_data_fallback = get_profile_data(user_id=owner_user_id)
-                    logger.info(f"Retrieved fallback profile for error recovery: {profile_data_fallback.get('id', 'None')}")
+                    logger.info("Retrieved fallback profile for error recovery: %s", profile_data_fallback.get('id', 'None'))
             except Exception as profile_error:
-                logger.error(f"Error getting profile data for fallback: {str(profile_error)}")
+                logger.error("Error getting profile data for fallback: %s", str(profile_error))
             
             # Generate a basic response without vector DB or history
             fallback_response = "I'm sorry, I encountered an error processing your request. Please try again."
@@ -199,12 +198,13 @@ async def chat(request: models.ChatRequest):
                     )
                     logger.info("Generated fallback AI response after error")
                 except Exception as ai_error:
-                    logger.error(f"Error generating fallback AI response: {str(ai_error)}")
+                    logger.error("Error generating fallback AI response: %s", str(ai_error))
             
             # Try to log the incoming message with the error response
             try:
                  if conversation_id: # Only log if we managed to get a conversation ID
-                     log_chat_message(
+                     await asyncio.to_thread(
+                         log_chat_message,
                          conversation_id=conversation_id,
                          message=request.message if request else "[Original message unavailable]", 
                          sender="user", 
@@ -215,12 +215,12 @@ async def chat(request: models.ChatRequest):
                  else:
                      logger.warning("Cannot log failed request as conversation_id was not determined.")
             except Exception as log_fallback_error:
-                logger.error(f"Error logging failed request: {str(log_fallback_error)}")
+                logger.error("Error logging failed request: %s", str(log_fallback_error))
 
             # Calculate time for error handling
             end_time = time.time()
             query_time_ms = (end_time - start_time) * 1000
-            logger.info(f"Error recovery completed in {query_time_ms:.0f}ms")
+            logger.info("Error recovery completed in %.0fms", query_time_ms)
             
             # Return the fallback response
             return models.ChatResponse(
@@ -230,7 +230,7 @@ async def chat(request: models.ChatRequest):
             
         except Exception as fallback_exception:
             # If even the fallback fails, log it and raise the original exception
-            logger.error(f"Critical error in fallback handling: {str(fallback_exception)}")
+            logger.error("Critical error in fallback handling: %s", str(fallback_exception))
             logger.error(traceback.format_exc())
         
         # Re-raise the original exception if fallback logging failed
@@ -245,6 +245,8 @@ async def get_chat_history_endpoint(
     chatbot_id: str = Query(..., description="The ID of the chatbot"),
     visitor_id: str = Query(..., description="The ID of the visitor"),
     limit: int = Query(50, description="Maximum number of messages to return"), 
+    before: Optional[str] = Query(None, description="Only return messages created before this timestamp (the first message's created_at of the previous page)"),
+    before_id: Optional[str] = Query(None, description="The first message's id of the previous page; pages ties on created_at by id"),
     current_user: Optional[User] = Depends(get_current_user) # Keep auth check if needed
 ):
     """
@@ -252,7 +254,13 @@ async def get_chat_history_endpoint(
     Updated to use conversation logic.
     """
     try:
-        logger.info(f"Getting chat history for chatbot {chatbot_id}, visitor {visitor_id}")
+        logger.info("Getting chat history for chatbot %s, visitor %s", chatbot_id, visitor_id)
+
+        # A bad cursor is the client's error; don't let it look like "no older messages"
+        try:
+            parse_history_cursor(before, before_id)
+        except ValueError as cursor_err:
+            raise HTTPException(status_code=400, detail=str(cursor_err))
 
         # --- Authentication/Authorization Check (Optional) ---
         # If you need to ensure the current_user owns the chatbot_id
@@ -269,29 +277,31 @@ async def get_chat_history_endpoint(
             db_visitor_id = visitor_record.get('id') if visitor_record else visitor_id
             if not db_visitor_id:
                 raise ValueError("Could not find or resolve visitor record")
-            logger.info(f"Using visitor UUID {db_visitor_id} for history lookup")
+            logger.info("Using visitor UUID %s for history lookup", db_visitor_id)
             visitor_id = str(db_visitor_id) # Use the UUID from now on
         except Exception as visitor_err:
-            logger.error(f"Failed to get visitor UUID for history: {visitor_err}")
+            logger.error("Failed to get visitor UUID for history: %s", visitor_err)
             raise HTTPException(status_code=404, detail=f"Visitor not found: {visitor_id}")
 
         try:
             conversation_id = get_or_create_conversation(chatbot_id=chatbot_id, visitor_id=visitor_id)
-            logger.info(f"Found conversation_id: {conversation_id} for history")
+            logger.info("Found conversation_id: %s for history", conversation_id)
         except ValueError as ve:
-             logger.error(f"Value error finding conversation for history: {ve}")
+             logger.error("Value error finding conversation for history: %s", ve)
              raise HTTPException(status_code=404, detail=f"Conversation not found: {ve}")
         except Exception as e:
-             logger.error(f"Error finding conversation for history: {e}")
+             logger.error("Error finding conversation for history: %s", e)
              raise HTTPException(status_code=500, detail="Error retrieving conversation")
 
         # --- Fetch History --- 
         history_messages = get_chat_history(
             conversation_id=conversation_id,
-            limit=limit
+            limit=limit,
+            before=before,
+            before_id=before_id
         )
         
-        logging.info(f"Retrieved {len(history_messages)} messages for conversation {conversation_id}")
+        logging.info("Retrieved %s messages for conversation %s", len(history_messages), conversation_id)
 
         # --- Format Response --- 
         # The backend DB function now returns a list of message dicts.
@@ -318,7 +328,7 @@ async def get_chat_history_endpoint(
     except HTTPException as he:
         raise he # Re-raise HTTP exceptions
     except Exception as e:
-        logger.error(f"Error in get_chat_history_endpoint: {e}")
+        logger.error("Error in get_chat_history_endpoint: %s", e)
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail="Internal Server Error retrieving history")
 
@@ -331,11 +341,11 @@ async def get_chatbots(current_user: User = Depends(get_current_user)):
         if not current_user:
             raise HTTPException(status_code=401, detail="Authentication required")
 
-        logger.info(f"Fetching chatbots for authenticated user: {current_user.id}")
+        logger.info("Fetching chatbots for authenticated user: %s", current_user.id)
         chatbots = get_user_chatbots(user_id=current_user.id)
 
         if chatbots is None: # Check if function returned None due to error
-            logger.error(f"Database function get_user_chatbots returned None for user {current_user.id}")
+            logger.error("Database function get_user_chatbots returned None for user %s", current_user.id)
             raise HTTPException(status_code=500, detail="Failed to retrieve chatbots from database.")
 
         # Convert the list of dicts to a list of ChatbotModel instances
@@ -343,7 +353,7 @@ async def get_chatbots(current_user: User = Depends(get_current_user)):
         return chatbots
 
     except Exception as e:
-        logger.error(f"Error getting chatbots: {e}")
+        logger.error("Error getting chatbots: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to get chatbots: {str(e)}"
@@ -367,11 +377,11 @@ async def update_chatbot(
          raise HTTPException(status_code=400, detail="Configuration data is required for update.")
          
     try:
-        logger.info(f"Attempting to update chatbot {chatbot_id} for user {current_user.id}")
+        logger.info("Attempting to update chatbot %s for user %s", chatbot_id, current_user.id)
         
         # Log the public_url_slug if provided
         if update_data.public_url_slug is not None:
-            logger.info(f"Received public_url_slug update: {update_data.public_url_slug}")
+            logger.info("Received public_url_slug update: %s", update_data.public_url_slug)
         
         updated_chatbot = update_chatbot_config(
             chatbot_id=chatbot_id,
@@ -388,7 +398,7 @@ async def update_chatbot(
             raise HTTPException(status_code=404, detail=f"Chatbot not found or update failed for ID: {chatbot_id}")
             
     except Exception as e:
-        logger.error(f"Error updating chatbot {chatbot_id}: {e}")
+        logger.error("Error updating chatbot %s: %s", chatbot_id, e)
         logger.error(traceback.format_exc())
         raise HTTPException(
             status_code=500,
@@ -419,7 +429,7 @@ async def get_public_chatbot_by_user_id(user_id: str):
         
         return chatbot
     except Exception as e:
-        logger.error(f"Error getting public chatbot by user ID: {e}")
+        logger.error("Error getting public chatbot by user ID: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to get chatbot: {str(e)}"
@@ -439,8 +449,8 @@ async def chat_with_public_chatbot(user_id: str, request: models.ChatRequest):
         visitor_name = request.visitor_name
         
         # Add detailed logging
-        logger.info(f"Public chat request for user_id {user_id} from visitor {visitor_id} (name: {visitor_name or 'unknown'})")
-        logger.info(f"Message: {message[:100]}..." if len(message) > 100 else f"Message: {message}")
+        logger.info("Public chat request for user_id %s from visitor %s (name: %s)", user_id, visitor_id, visitor_name or 'unknown')
+        logger.debug("Message: %.100s%s", message, "..." if len(message) > 100 else "")
         
         # Basic input validation
         if not message or message.strip() == "":
@@ -450,8 +460,12 @@ async def chat_with_public_chatbot(user_id: str, request: models.ChatRequest):
                 query_time_ms=0
             )
         
-        # Get or create the chatbot for this user
-        chatbot = get_or_create_chatbot(user_id=user_id)
+        # The chatbot and visitor lookups don't depend on each other, so run them concurrently
+        # in worker threads instead of back to back on the event loop
+        chatbot, visitor_record = await asyncio.gather(
+            asyncio.to_thread(get_or_create_chatbot, user_id=user_id),
+            asyncio.to_thread(get_or_create_visitor, visitor_id, visitor_name),
+        )
         if not chatbot:
             raise HTTPException(status_code=404, detail=f"No chatbot found for user {user_id}")
         
@@ -464,19 +478,8 @@ async def chat_with_public_chatbot(user_id: str, request: models.ChatRequest):
         
         # We know the owner's user_id is the user_id from the path
         owner_user_id = user_id
-        logger.info(f"Using chatbot owned by user_id: {owner_user_id}")
+        logger.info("Using chatbot owned by user_id: %s", owner_user_id)
         
-        # Always get the profile data for the chatbot OWNER
-        profile_data = get_profile_data(user_id=owner_user_id)
-        if profile_data:
-            profile_id = profile_data.get('id', 'None')
-            logger.info(f"Loaded profile data for chatbot owner (user_id={owner_user_id}): profile_id={profile_id}")
-        else:
-            logger.warning(f"No profile data found for chatbot owner (user_id={owner_user_id}) - using empty profile")
-            profile_data = {}
-        
-        # Create or get visitor record
-        visitor_record = get_or_create_visitor(visitor_id, visitor_name)
         if not visitor_record:
             raise HTTPException(status_code=500, detail="Failed to create or retrieve visitor record")
             
@@ -485,43 +488,46 @@ async def chat_with_public_chatbot(user_id: str, request: models.ChatRequest):
             raise HTTPException(status_code=500, detail="Failed to get visitor ID from record")
         
         # Get or create the conversation
-        conversation_id = get_or_create_conversation(
+        conversation_id = await asyncio.to_thread(
+            get_or_create_conversation,
             chatbot_id=str(chatbot["id"]),
-            visitor_id=str(db_visitor_id)
-        )
-        logger.info(f"Using conversation ID: {conversation_id} for chat")
-        
-        # Get context for the AI by searching vector DB, including relevant conversation history
-        logger.info(f"Querying vector DB for relevant context and conversation history with user_id: {owner_user_id}")
-        search_results = query_vector_db(
-            query=message, 
-            user_id=owner_user_id,  # Pass the chatbot owner's user_id explicitly
-            visitor_id=visitor_id,
-            include_conversation=True
+            visitor_id=str(db_visitor_id),
+            owner_user_id=owner_user_id
         )
+        logger.info("Using conversation ID: %s for chat", conversation_id)
         
-        # Get recent conversation history for this conversation
-        logger.info(f"Fetching sequential conversation history for conversation {conversation_id}")
+        # Load the chatbot OWNER's profile, search the vector DB (including relevant conversation
+        # history) and fetch recent messages concurrently - none of these depend on each other
+        logger.info("Querying profile, vector DB and conversation history with user_id: %s", owner_user_id)
         history_limit = 10  # Get the last 10 messages (5 exchanges)
-        chat_history = get_chat_history(
-            conversation_id=conversation_id,
-            limit=history_limit
+        profile_data, search_results, chat_history = await asyncio.gather(
+            asyncio.to_thread(get_profile_data, user_id=owner_user_id),
+            asyncio.to_thread(
+                query_vector_db,
+                query=message, 
+                user_id=owner_user_id,  # Pass the chatbot owner's user_id explicitly
+                visitor_id=visitor_id,
+                include_conversation=True
+            ),
+            asyncio.to_thread(get_chat_history, conversation_id=conversation_id, limit=history_limit),
         )
         
-        # Sort the history by timestamp (oldest first)
+        if profile_data:
+            profile_id = profile_data.get('id', 'None')
+            logger.info("Loaded profile data for chatbot owner (user_id=%s): profile_id=%s", owner_user_id, profile_id)
+        else:
+            logger.warning("No profile data found for chatbot owner (user_id=%s) - using empty profile", owner_user_id)
+            profile_data = {}
+        
+        # get_chat_history already returns messages oldest first
         if chat_history:
-            chat_history = sorted(
-                chat_history,
-                key=lambda x: x.get("created_at", "") or x.get("timestamp", ""),
-                reverse=False  # Oldest messages first
-            )
-            logger.info(f"Found {len(chat_history)} previous messages in conversation history")
+            logger.info("Found %s previous messages in conversation history", len(chat_history))
         else:
             logger.info("No previous conversation history found")
             chat_history = []
         
         # Generate the AI response
-        logger.info(f"Generating AI response with conversation context")
+        logger.info("Generating AI response with conversation context")
         ai_response = await generate_ai_response(
             message=message,
             search_results=search_results,
@@ -536,8 +542,9 @@ async def chat_with_public_chatbot(user_id: str, request: models.ChatRequest):
             ai_response = "I apologize, but I couldn't formulate a proper response. Could we try a different question?"
         
         # Log the message to the database
-        logger.info(f"Logging chat message to database")
-        log_result = log_chat_message(
+        logger.info("Logging chat message to database")
+        log_result = await asyncio.to_thread(
+            log_chat_message,
             conversation_id=conversation_id,
             message=message, 
             sender="user", 
@@ -550,7 +557,7 @@ async def chat_with_public_chatbot(user_id: str, request: models.ChatRequest):
             message_id = log_result[0].get("id")
 
         if message_id:
-            logger.info(f"Adding conversation to vector database for future reference with user_id: {owner_user_id}")
+            logger.info("Adding conversation to vector database for future reference with user_id: %s", owner_user_id)
             add_conversation_to_vector_db(
                 message=message,
                 response=ai_response,
@@ -564,7 +571,7 @@ async def chat_with_public_chatbot(user_id: str, request: models.ChatRequest):
         # Calculate time taken
         end_time = time.time()
         query_time_ms = (end_time - start_time) * 1000
-        logger.info(f"Public request completed in {query_time_ms:.0f}ms")
+        logger.info("Public request completed in %.0fms", query_time_ms)
         
         return models.ChatResponse(
             response=ai_response,
@@ -577,7 +584,7 @@ async def chat_with_public_chatbot(user_id: str, request: models.ChatRequest):
         import traceback
         # logger = logging.getLogger(__name__) # <-- REMOVE THIS LINE. Use module-level logger.
 
-        logger.error(f"Error in public chat route: {str(e)}")
+        logger.error("Error in public chat route: %s", str(e))
         logger.error(traceback.format_exc()) # Log the full traceback
         
         # Raise HTTPException to return a proper 500 error
@@ -597,7 +604,7 @@ async def get_public_chat_history(
     """
     try:
         # Log the request details
-        logger.info(f"Getting public chat history for user_id: {user_id}, visitor_id: {visitor_id}")
+        logger.info("Getting public chat history for user_id: %s, visitor_id: %s", user_id, visitor_id)
         
         # Get the chatbot for this user
         chatbot = get_or_create_chatbot(user_id=user_id)
@@ -630,7 +637,7 @@ async def get_public_chat_history(
                 logger.error("Failed to get visitor ID from record")
                 return models.ChatHistoryResponse(history=[], count=0)
         except Exception as ve:
-            logger.error(f"Error finding/creating visitor: {ve}")
+            logger.error("Error finding/creating visitor: %s", ve)
             raise HTTPException(status_code=500, detail=f"Visitor error: {str(ve)}")
 
         # Find the conversation ID using chatbot_id and visitor's DB UUID
@@ -639,12 +646,12 @@ async def get_public_chat_history(
                 chatbot_id=str(chatbot["id"]), 
                 visitor_id=str(db_visitor_id)
             )
-            logger.info(f"Found conversation_id: {conversation_id} for public history")
+            logger.info("Found conversation_id: %s for public history", conversation_id)
         except ValueError as ve:
-            logger.error(f"Value error finding public conversation: {ve}")
+            logger.error("Value error finding public conversation: %s", ve)
             raise HTTPException(status_code=404, detail=f"Conversation not found: {ve}")
         except Exception as e:
-            logger.error(f"Error finding public conversation for history: {e}")
+            logger.error("Error finding public conversation for history: %s", e)
             raise HTTPException(status_code=500, detail="Error retrieving conversation")
 
         # Get chat history using the conversation ID
@@ -673,12 +680,12 @@ async def get_public_chat_history(
             count=len(formatted_history)
         )
         
-        logger.info(f"Returning public chat history with {len(formatted_history)} items")
+        logger.info("Returning public chat history with %s items", len(formatted_history))
         return response
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting public chat history: {e}")
+        logger.error("Error getting public chat history: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to get public chat history: {str(e)}"
@@ -691,13 +698,13 @@ async def get_public_chatbot_by_slug(slug: str):
     Get a chatbot by its public URL slug (no authentication required)
     """
     try:
-        logger.info(f"Attempting to fetch public chatbot by slug: {slug}")
+        logger.info("Attempting to fetch public chatbot by slug: %s", slug)
         # Use the existing database function to find by slug
         chatbot = get_or_create_chatbot(slug=slug) 
         
         # Explicitly check if chatbot is None or empty
         if not chatbot or not isinstance(chatbot, dict) or not chatbot.get("id"):
-            logger.warning(f"No chatbot found for public slug: {slug}")
+            logger.warning("No chatbot found for public slug: %s", slug)
             raise HTTPException(
                 status_code=404,
                 detail=f"No chatbot found with the slug: {slug}"
@@ -705,13 +712,13 @@ async def get_public_chatbot_by_slug(slug: str):
         
         # Ensure it's marked as public (important security check)
         if not chatbot.get("is_public", False): # Default to False if not set
-            logger.warning(f"Chatbot found by slug {slug}, but it's not public.")
+            logger.warning("Chatbot found by slug %s, but it's not public.", slug)
             raise HTTPException(
                 status_code=403,
                 detail="This chatbot is not publicly accessible"
             )
         
-        logger.info(f"Successfully found public chatbot by slug {slug}: {chatbot.get('id')}")
+        logger.info("Successfully found public chatbot by slug %s: %s", slug, chatbot.get('id'))
         # Ensure configuration is a dict, default to empty if null/invalid
         if not isinstance(chatbot.get('configuration'), dict):
             chatbot['configuration'] = {}
@@ -723,7 +730,7 @@ async def get_public_chatbot_by_slug(slug: str):
         # Re-raise HTTP exceptions directly
         raise he
     except Exception as e:
-        logger.error(f"Error getting public chatbot by slug {slug}: {e}")
+        logger.error("Error getting public chatbot by slug %s: %s", slug, e)
         logger.error(traceback.format_exc())
         # Return a 404 for any unhandled errors since it's a slug lookup
         raise HTTPException(
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, HTTPException, Depends, Header, Query
+import asyncio
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Header, Query
 from typing import Optional, List
-from datetime import datetime
+import logging
 
 from app import models
 from app.database import get_profile_data, update_profile_data
@@ -8,6 +9,12 @@ from app.embeddings import add_profile_to_vector_db
 from app.routes.admin import verify_admin_token
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+def _index_profile(data_dict, user_id):
+    """Add the saved profile to the vector database for search"""
+    if not add_profile_to_vector_db(data_dict, user_id=user_id):
+        logger.warning("Failed to update vector database")
 
 @router.get("/", response_model=models.ProfileData)
 async def get_profile(user_id: Optional[str] = Query(None, description="Specific user profile to retrieve")):
@@ -30,10 +37,12 @@ async def get_profile(user_id: Optional[str] = Query(None, description="Specific
                 projects="No projects listed yet.",
                 interests="Hobby 1, Hobby 2, Hobby 3"
             )
-        return models.ProfileData(**profile_data)
+        # response_model validates and serialises the row once; building a ProfileData here as well
+        # would make FastAPI dump it back to a dict and validate it a second time
+        return profile_data
     
     except Exception as e:
-        print(f"Error getting profile data: {e}")
+        logger.error("Error getting profile data: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to get profile data: {str(e)}"
@@ -42,6 +51,7 @@ async def get_profile(user_id: Optional[str] = Query(None, description="Specific
 @router.put("/", response_model=models.ProfileData)
 async def update_profile(
     profile_data: models.ProfileData, 
+    background_tasks: BackgroundTasks,
     user = Depends(verify_admin_token),
 ):
     """
@@ -51,16 +61,15 @@ async def update_profile(
         # Convert to dict for database
         data_dict = profile_data.dict()
         
-        # Add/update timestamp for updating
-        data_dict["updated_at"] = datetime.utcnow().isoformat()
-        
+        # update_profile_data stamps updated_at itself
         # Update in database with the authenticated user's ID
-        print(f"Updating profile for user {user.id} with data: {data_dict}")
-        updated_data = update_profile_data(data_dict, user_id=user.id)
+        logger.debug("Updating profile for user %s with data: %s", user.id, data_dict)
+        # Blocking Supabase calls run in a worker thread so they don't stall the event loop
+        updated_data = await asyncio.to_thread(update_profile_data, data_dict, user_id=user.id)
         
         # Check if the database update failed
         if updated_data is None:
-            print(f"Database update failed for user {user.id}") # Use print or logger
+            logger.error("Database update failed for user %s", user.id)
             raise HTTPException(
                 status_code=500,
                 # Provide a more specific error message if possible, 
@@ -68,20 +77,17 @@ async def update_profile(
                 detail="Failed to update profile data in the database. Check backend logs for details."
             )
         
-        # If update succeeded, proceed to update vector DB
-        print(f"Database update successful for user {user.id}, proceeding with vector DB update")
-        
-        # Add to vector database for search
-        vector_update_success = add_profile_to_vector_db(data_dict, user_id=user.id)
-        if not vector_update_success:
-            print("Warning: Failed to update vector database")
+        # If update succeeded, re-index the profile for search. Embedding it is the slowest step
+        # and the response doesn't depend on it, so it runs after the response is sent.
+        logger.debug("Database update successful for user %s, scheduling vector DB update", user.id)
+        background_tasks.add_task(_index_profile, data_dict, user.id)
         
-        return models.ProfileData(**updated_data)
+        return updated_data
     
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error updating profile data: {e}")
+        logger.error("Error updating profile data: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Failed to update profile data: {str(e)}"
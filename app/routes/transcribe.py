@@ -1,3 +1,4 @@
+import logging
 import shutil
 import tempfile
 import openai
@@ -6,6 +7,7 @@ from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Backgro
 from app.auth import get_current_user, User  # Fixed import path
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 # Configure OpenAI API key from environment variable
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -21,7 +23,7 @@ def delete_temp_file(path: str):
             os.remove(path)
     except Exception as e:
         # Log error during temp file deletion, if necessary
-        print(f"Error deleting temporary file {path}: {e}")
+        logger.error("Error deleting temporary file %s: %s", path, e)
 
 @router.post("/transcribe-audio")
 async def transcribe_audio_endpoint(
@@ -0,0 +1,14 @@
+-- Index behind get_chat_history in app/database.py, which runs
+--   SELECT ... FROM messages WHERE conversation_id = ? ORDER BY created_at DESC, id DESC LIMIT n
+-- on every chat turn. With it Postgres reads the newest n rows of one conversation straight from the
+-- index instead of collecting every message in the conversation and sorting them.
+-- The admin history page (messages joined to conversations, newest first) uses the same index.
+--
+-- CONCURRENTLY avoids locking messages against inserts while the index builds, but it cannot run inside
+-- a transaction block: run this statement on its own.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_messages_conversation_created_at
+    ON messages (conversation_id, created_at DESC, id DESC);
+
+-- idx_messages_conversation_id (add_conversations.sql) is a prefix of the index above and is now redundant.
+-- Once the new index is valid it can be dropped to save a write per inserted message:
+-- DROP INDEX CONCURRENTLY IF EXISTS idx_messages_conversation_id;
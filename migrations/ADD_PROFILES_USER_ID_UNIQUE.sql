@@ -0,0 +1,14 @@
+-- Unique constraint behind update_profile_data's upsert(on_conflict="user_id") in app/database.py.
+-- schema.sql declares UNIQUE(user_id) on profiles, but databases created from older scripts may lack it,
+-- and without it PostgREST rejects the upsert (no unique or exclusion constraint matching ON CONFLICT).
+-- Remove duplicate profiles first (keeping the most recently updated row per user) so the index can be built.
+DELETE FROM profiles p
+USING profiles newer
+WHERE p.user_id = newer.user_id
+  AND (COALESCE(p.updated_at, '-infinity'), p.id::text)
+    < (COALESCE(newer.updated_at, '-infinity'), newer.id::text);
+
+CREATE UNIQUE INDEX IF NOT EXISTS profiles_user_id_key ON profiles (user_id);
+
+-- Force cache refresh
+NOTIFY pgrst, 'reload config';
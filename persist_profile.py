@@ -1,13 +1,13 @@
 #!/usr/bin/env python3
-import json
 import os
+import orjson
 from app.database import in_memory_profile
 
 def save_in_memory_profile():
     """Save the in-memory profile to a file for persistence"""
     try:
-        with open('profile_backup.json', 'w') as f:
-            json.dump(in_memory_profile, f, indent=2)
+        with open('profile_backup.json', 'wb') as f:
+            f.write(orjson.dumps(in_memory_profile, option=orjson.OPT_INDENT_2))
         print("In-memory profile saved to profile_backup.json")
     except Exception as e:
         print(f"Error saving in-memory profile: {e}")
@@ -16,8 +16,8 @@ def load_in_memory_profile():
     """Load the in-memory profile from a file"""
     try:
         if os.path.exists('profile_backup.json'):
-            with open('profile_backup.json', 'r') as f:
-                profile_data = json.load(f)
+            with open('profile_backup.json', 'rb') as f:
+                profile_data = orjson.loads(f.read())
                 in_memory_profile.update(profile_data)
                 print("In-memory profile loaded from profile_backup.json")
                 return True
@@ -32,6 +32,8 @@ if __name__ == "__main__":
     action = input("Enter 'save' to save profile or 'load' to load profile: ").strip().lower()
     
     if action == 'save':
+        # app.database reads the backup lazily, so pick it up before writing it back out
+        load_in_memory_profile()
         save_in_memory_profile()
     elif action == 'load':
         load_in_memory_profile()